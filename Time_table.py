@@ -1,7 +1,15 @@
-import streamlit as st
-import prettytable as prettytable 
+import csv
+import hashlib
+import io
+import json
+import os
 import random as rd
-from datetime import datetime, timedelta
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 
 # Constants
 POPULATION_SIZE = 50
@@ -9,6 +17,32 @@ NUMB_OF_ELITE_SCHEDULES = 1
 TOURNAMENT_SELECTION_SIZE = 3  
 MUTATION_RATE = 0.1
 GENERATIONS = 2000
+CROSSOVER_METHOD = "uniform"  # "uniform", "slot" or "reinitialize"
+MUTATION_METHOD = "targeted"  # "targeted" or "reinitialize"
+MUTATION_GENES = 4  # most genes one targeted mutation moves
+ISLAND_WORKERS = 1
+MIN_ISLAND_POPULATION = 10  # schedules per panel on each island, however many workers share the population
+MIGRATION_INTERVAL = 50
+MIGRATION_SIZE = 2
+MULTI_PANEL_ROUND_GENERATIONS = 5
+LOCAL_SEARCH_SCHEDULES = 2  # schedules per panel the memetic solver improves each generation
+LOCAL_SEARCH_STEPS = 30
+LOCAL_SEARCH_MOVES = 12  # candidate moves scored per tabu step
+TABU_TENURE = 7
+FITNESS_CACHE_SIZE = 4096  # fingerprints the GA remembers fitness for, 0 to disable
+TIME_LIMIT = None  # seconds per solve, None for no limit
+STAGNATION_LIMIT = None  # generations without improvement before giving up, None for no limit
+ADAPTIVE_PARAMETERS = True
+DIVERSITY_TARGET = 0.2  # below this the GA mutates more and selects less greedily
+MAX_MUTATION_RATE = 0.5
+EXACT_NODE_LIMIT = 200000  # assignments the exact solver tries before falling back to local search
+EXACT_RESTART_NODES = 1000  # first restart cutoff of the exact solver, doubled on every restart
+SOLVERS = ("ga", "memetic", "multipanel", "exact")
+RESULT_CACHE_DIR = ".timetable_cache"
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+EXPORT_COLUMNS = ["Panel", "Batch", "Department", "Course", "Room", "Professor", "Day", "Start", "End"]
+EXPORT_FORMATS = {".csv": "text/csv", ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                  ".ics": "text/calendar"}
 UNIVERSITY_START_TIME = datetime.strptime("08:30", "%H:%M")
 UNIVERSITY_END_TIME = datetime.strptime("17:45", "%H:%M")
 LUNCH_BREAK_START = datetime.strptime("12:45", "%H:%M")
@@ -21,6 +55,10 @@ BREAKONE_END_TIME = datetime.strptime("10:45", "%H:%M")
 BREAKTWO_START_TIME = datetime.strptime("15:30", "%H:%M")
 BREAKTWO_END_TIME = datetime.strptime("15:45", "%H:%M")
 
+class InfeasibleInstanceError(ValueError):
+    # The instance has no conflict-free timetable at all
+    pass
+
 class Room:
     def __init__(self, number):
         self._number = number
@@ -83,6 +121,7 @@ class ClassTime:
         self._day = day
         self._time = time
         self._duration = duration
+        self._start_time = datetime.strptime(time, "%H:%M")
 
     def get_id(self):
         return self._id
@@ -96,9 +135,14 @@ class ClassTime:
     def get_duration(self):
         return self._duration
 
+    def get_start_minutes(self):
+        return self._start_time.hour * 60 + self._start_time.minute
+
+    def get_end_minutes(self):
+        return self.get_start_minutes() + int(self._duration.total_seconds()) // 60
+
     def is_within_break(self):
-        start_time = datetime.strptime(self._time, "%H:%M")
-        end_time = start_time + self._duration
+        start_time = self._start_time
 
         # Check against all defined breaks
         if (BREAKONE_START_TIME <= start_time < BREAKONE_END_TIME) or \
@@ -128,18 +172,28 @@ class Data:
         self._depts = []
         self._panels = []
         self.max_classes_per_day = 5  
+        # Interned integer ids used by the compact gene encoding
+        self._room_ids = {}
+        self._room_numbers = []
+        self._professor_ids = {}
+        self._professor_names = []
+        self._slot_tables = None
 
     def add_room(self, room):
         self._rooms.append(room)
+        self.get_room_id(room)
 
     def add_lab_room(self, room):
         self._lab_rooms.append(room)
+        self.get_room_id(room)
 
     def add_class_time(self, class_time):
         self._class_times.append(class_time)
+        self._slot_tables = None
 
     def add_professor(self, professor):
         self._professors.append(professor)
+        self.get_professor_id(professor)
 
     def add_course(self, course):
         self._courses.append(course)
@@ -171,6 +225,26 @@ class Data:
     def get_panels(self):
         return self._panels
 
+    def get_room_id(self, room):
+        return self._intern(self._room_ids, self._room_numbers, room.get_number())
+
+    def get_room_number(self, room_id):
+        return self._room_numbers[room_id]
+
+    def get_professor_id(self, professor):
+        return self._intern(self._professor_ids, self._professor_names, professor.get_name())
+
+    def get_professor_name(self, professor_id):
+        return self._professor_names[professor_id]
+
+    def _intern(self, ids, values, value):
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = len(values)
+            ids[value] = value_id
+            values.append(value)
+        return value_id
+
     def generate_class_times(self):
         class_time_id = 1
         for day in DAYS_OF_WEEK:
@@ -186,206 +260,2417 @@ class Data:
                         self.add_class_time(lab_time)
                         class_time_id += 1
                 current_time += TIME_SLOT_DURATION
+        self._build_slot_tables()
+
+    def get_lecture_slots(self):
+        return self._get_slot_tables()["lecture_slots"]
+
+    def get_lab_slots(self):
+        return self._get_slot_tables()["lab_slots"]
+
+    def get_slot_starts(self):
+        return self._get_slot_tables()["starts"]
+
+    def get_slot_ends(self):
+        return self._get_slot_tables()["ends"]
+
+    def get_slot_days(self):
+        return self._get_slot_tables()["days"]
+
+    def get_slot_overlaps(self):
+        return self._get_slot_tables()["overlaps"]
+
+    def get_overlapping_slots(self, slot):
+        return self._get_slot_tables()["neighbours"][slot]
+
+    def get_slot_masks(self):
+        return self._get_slot_tables()["masks"]
+
+    def _get_slot_tables(self):
+        if self._slot_tables is None:
+            self._build_slot_tables()
+        return self._slot_tables
+
+    def _build_slot_tables(self):
+        # Slot indexes refer to positions in self._class_times. Two slots overlap when
+        # they share a day and their [start, end) minute ranges intersect.
+        class_times = self._class_times
+        starts = np.array([ct.get_start_minutes() for ct in class_times], dtype=np.int64)
+        ends = np.array([ct.get_end_minutes() for ct in class_times], dtype=np.int64)
+        days = np.array([DAYS_OF_WEEK.index(ct.get_day()) for ct in class_times], dtype=np.int64)
+        overlaps = ((days[:, None] == days[None, :]) &
+                    (starts[:, None] < ends[None, :]) &
+                    (starts[None, :] < ends[:, None]))
+        self._slot_tables = {
+            "lecture_slots": [i for i, ct in enumerate(class_times)
+                              if ct.get_duration() == TIME_SLOT_DURATION and not ct.is_within_break()],
+            "lab_slots": [i for i, ct in enumerate(class_times)
+                          if ct.get_duration() == LAB_TIME_SLOT_DURATION and not ct.is_within_break()],
+            "starts": starts,
+            "ends": ends,
+            "days": days.tolist(),
+            "overlaps": overlaps,
+            "neighbours": [np.flatnonzero(row).tolist() for row in overlaps],
+            # One bit per slot: occupancy & masks[slot] == 0 means nothing overlaps slot
+            "masks": [sum(1 << other for other in np.flatnonzero(row).tolist()) for row in overlaps],
+        }
+
+class Gene:
+    # One scheduled class as interned ids. batch 0 means the whole panel ("All"),
+    # batch n > 0 is a lab for "Batch n". class_time indexes Data.get_class_times().
+    __slots__ = ('dept', 'course', 'room', 'professor', 'batch', 'class_time')
+
+    def __init__(self, dept, course, room, professor, batch, class_time):
+        self.dept = dept
+        self.course = course
+        self.room = room
+        self.professor = professor
+        self.batch = batch
+        self.class_time = class_time
+
+    def decode(self, data, panel):
+        dept = data.get_depts()[self.dept]
+        course = dept.get_courses()[self.course]
+        class_time = data.get_class_times()[self.class_time]
+        return {
+            "panel": panel.get_name(),
+            "batch": f"Batch {self.batch}" if self.batch else "All",
+            "department": dept.get_name(),
+            "course": f"{course.get_name()} (Lab)" if self.batch else course.get_name(),
+            "room": data.get_room_number(self.room),
+            "professor": data.get_professor_name(self.professor),
+            "class_time": f"{class_time.get_day()} {class_time.get_time()} ({class_time.get_duration()})"
+        }
+
+    def to_tuple(self):
+        return (self.dept, self.course, self.room, self.professor, self.batch, self.class_time)
+
+class ConflictIndex:
+    # Counts classes per (timeslot, room), (timeslot, professor), (timeslot, batch)
+    # and (professor, day) so conflicts can be kept up to date one gene at a time.
+    # Two classes clash when their timeslots overlap (Data.get_slot_overlaps). A lecture
+    # is attended by every batch, so it also clashes with any overlapping class of the panel.
+    def __init__(self, data):
+        self._data = data
+        self._days = data.get_slot_days()
+        self._neighbours = [data.get_overlapping_slots(slot) for slot in range(len(data.get_class_times()))]
+        self._rooms = {}
+        self._professors = {}
+        self._batches = {}
+        self._lectures = {}  # (timeslot, 0) -> lectures of the panel
+        self._classes = {}  # (timeslot, 0) -> classes of the panel
+        self._daily = {}
+        self._conflicts = 0
+        self._over_limit = 0
+
+    def add(self, gene):
+        slot = gene.class_time
+        self._conflicts += self._increment(self._rooms, slot, gene.room)
+        self._conflicts += self._increment(self._professors, slot, gene.professor)
+        if gene.batch:
+            self._conflicts += self._increment(self._batches, slot, gene.batch)
+            self._conflicts += self._count(self._lectures, slot, 0)
+        else:
+            self._conflicts += self._count(self._classes, slot, 0)
+            self._increment(self._lectures, slot, 0)
+        self._increment(self._classes, slot, 0)
+        key = (gene.professor, self._days[slot])
+        count = self._daily.get(key, 0) + 1
+        self._daily[key] = count
+        if count == self._data.max_classes_per_day + 1:
+            self._over_limit += 1
+
+    def remove(self, gene):
+        slot = gene.class_time
+        self._conflicts -= self._decrement(self._rooms, slot, gene.room)
+        self._conflicts -= self._decrement(self._professors, slot, gene.professor)
+        self._decrement(self._classes, slot, 0)
+        if gene.batch:
+            self._conflicts -= self._decrement(self._batches, slot, gene.batch)
+            self._conflicts -= self._count(self._lectures, slot, 0)
+        else:
+            self._decrement(self._lectures, slot, 0)
+            self._conflicts -= self._count(self._classes, slot, 0)
+        key = (gene.professor, self._days[slot])
+        count = self._daily[key] - 1
+        if count:
+            self._daily[key] = count
+        else:
+            del self._daily[key]
+        if count == self._data.max_classes_per_day:
+            self._over_limit -= 1
+
+    def is_free(self, class_time, room, professor, batch):
+        return (self.is_room_free(class_time, room) and self.is_professor_free(class_time, professor) and
+                self.is_batch_free(class_time, batch))
+
+    def is_room_free(self, class_time, room):
+        return self._count(self._rooms, class_time, room) == 0
+
+    def is_professor_free(self, class_time, professor):
+        return self._count(self._professors, class_time, professor) == 0
+
+    def is_batch_free(self, class_time, batch):
+        # A lecture needs the whole panel free, a lab its batch and no lecture
+        if not batch:
+            return self._count(self._classes, class_time, 0) == 0
+        return self._count(self._batches, class_time, batch) == 0 and self._count(self._lectures, class_time, 0) == 0
+
+    def get_conflicts(self):
+        return self._conflicts
+
+    def exceeds_daily_limits(self):
+        return self._over_limit > 0
+
+    def get_penalty(self):
+        return self._conflicts + (10 if self._over_limit else 0)
+
+    def get_gene_conflicts(self, gene):
+        # Clashes the (already added) gene takes part in, plus one if its professor's day is over the limit
+        slot = gene.class_time
+        conflicts = self._count(self._rooms, slot, gene.room) - 1
+        conflicts += self._count(self._professors, slot, gene.professor) - 1
+        if gene.batch:
+            conflicts += self._count(self._batches, slot, gene.batch) - 1 + self._count(self._lectures, slot, 0)
+        else:
+            conflicts += self._count(self._classes, slot, 0) - 1
+        if self._daily[(gene.professor, self._days[slot])] > self._data.max_classes_per_day:
+            conflicts += 1
+        return conflicts
+
+    def is_within_daily_limit(self, professor, class_time):
+        return self._daily.get((professor, self._days[class_time]), 0) < self._data.max_classes_per_day
+
+    def _count(self, counts, slot, resource):
+        # Classes holding the resource in any slot overlapping this one
+        return sum(counts.get((other, resource), 0) for other in self._neighbours[slot])
+
+    def _increment(self, counts, slot, resource):
+        # Returns the number of clashes the new class adds.
+        clashes = self._count(counts, slot, resource)
+        key = (slot, resource)
+        counts[key] = counts.get(key, 0) + 1
+        return clashes
+
+    def _decrement(self, counts, slot, resource):
+        # Returns the number of clashes removed with the class.
+        key = (slot, resource)
+        count = counts[key] - 1
+        if count:
+            counts[key] = count
+        else:
+            del counts[key]
+        return self._count(counts, slot, resource)
+
+class GlobalResourceIndex:
+    # Room and professor occupancy of one published schedule per panel. Lets a panel's
+    # candidates be scored against every other panel with O(1) lookups per gene.
+    def __init__(self, data):
+        panels = data.get_panels()
+        self._panel_indexes = {id(panel): i for i, panel in enumerate(panels)}
+        self._neighbours = [data.get_overlapping_slots(slot) for slot in range(len(data.get_class_times()))]
+        self._published = [[] for _ in panels]
+        self._rooms = {}
+        self._professors = {}
+        self._panel_rooms = [{} for _ in panels]
+        self._panel_professors = [{} for _ in panels]
+
+    def publish(self, schedule):
+        panel_index = self._panel_indexes[id(schedule._panel)]
+        for gene in self._published[panel_index]:
+            self._update(panel_index, gene, -1)
+        self._published[panel_index] = list(schedule.get_classes())
+        for gene in self._published[panel_index]:
+            self._update(panel_index, gene, 1)
+
+    def count_gene_conflicts(self, panel, gene):
+        # Published classes of other panels using the gene's room or professor in an overlapping slot
+        return (self.count_room_conflicts(panel, gene.class_time, gene.room) +
+                self.count_professor_conflicts(panel, gene.class_time, gene.professor))
+
+    def count_room_conflicts(self, panel, class_time, room):
+        return self._count_others(self._rooms, self._panel_rooms, panel, class_time, room)
+
+    def count_professor_conflicts(self, panel, class_time, professor):
+        return self._count_others(self._professors, self._panel_professors, panel, class_time, professor)
+
+    def _count_others(self, counts, panel_counts, panel, class_time, resource):
+        own = panel_counts[self._panel_indexes[id(panel)]]
+        conflicts = 0
+        for slot in self._neighbours[class_time]:
+            key = (slot, resource)
+            conflicts += counts.get(key, 0) - own.get(key, 0)
+        return conflicts
+
+    def count_conflicts(self, schedule):
+        return sum(self.count_gene_conflicts(schedule._panel, gene) for gene in schedule.get_classes())
+
+    def _update(self, panel_index, gene, delta):
+        for counts, key in ((self._rooms, (gene.class_time, gene.room)),
+                            (self._professors, (gene.class_time, gene.professor)),
+                            (self._panel_rooms[panel_index], (gene.class_time, gene.room)),
+                            (self._panel_professors[panel_index], (gene.class_time, gene.professor))):
+            count = counts.get(key, 0) + delta
+            if count:
+                counts[key] = count
+            else:
+                del counts[key]
+
+def share_resources(schedules, data):
+    # Publishes one schedule per panel to a new GlobalResourceIndex and scores every
+    # schedule against it, as MultiPanelEngine.run() leaves its results
+    shared_index = GlobalResourceIndex(data)
+    for schedule in schedules:
+        if schedule is not None:
+            shared_index.publish(schedule)
+    for schedule in schedules:
+        if schedule is not None:
+            schedule.set_shared_index(shared_index)
+    return schedules
+
+def place_across_panels(schedules, movable, local_search=None):
+    # Moves the classes at positions movable[p] of schedules[p] (one schedule per panel) to
+    # free places, then runs local search on them, and on whole schedules that still clash.
+    # Rooms and professors of the other panels are checked through a GlobalResourceIndex
+    # that holds the fixed classes of every panel and each panel's classes once placed.
+    # The schedules keep the index, so their fitness counts clashes across panels.
+    local_search = local_search or LocalSearch()
+    data = schedules[0]._data
+    shared_index = GlobalResourceIndex(data)
+    for schedule, positions in zip(schedules, movable):
+        positions = set(positions)
+        fixed = Schedule(data, schedule._panel)
+        fixed.set_classes([gene for i, gene in enumerate(schedule.get_classes()) if i not in positions])
+        shared_index.publish(fixed)
+    for schedule, positions in zip(schedules, movable):
+        schedule.set_shared_index(shared_index)
+        for i in positions:
+            schedule.set_class(i, schedule.find_free_gene(schedule.get_classes()[i]))
+        if positions:
+            local_search.improve(schedule, positions)
+        if schedule.get_conflict_index().get_penalty() + schedule.get_external_conflicts():
+            local_search.improve(schedule)
+        shared_index.publish(schedule)
+    # Panels placed later may have moved into earlier panels' clashes
+    for schedule in schedules:
+        schedule.invalidate_fitness()
+        if schedule.get_external_conflicts():
+            local_search.improve(schedule)
+            shared_index.publish(schedule)
+    for schedule in schedules:
+        schedule.invalidate_fitness()
+    return schedules
+
+def _gene_hash(position, gene):
+    return hash((position, gene.dept, gene.course, gene.room, gene.professor, gene.batch, gene.class_time))
 
 class Schedule:
-    def __init__(self, data, panel):
+    def __init__(self, data, panel, shared_index=None):
         self._data = data
         self._panel = panel
+        self._shared_index = shared_index
         self._classes = []
+        self._index = None
+        self._fingerprint = None
         self._fitness = -1
         self._is_fitness_changed = True
 
     def get_classes(self):
-        self._is_fitness_changed = True
         return self._classes
 
-    def initialize(self):
-        self._classes = []
-        available_class_times = self._data.get_class_times().copy()
-
-        for dept in self._data.get_depts():
-            for course in dept.get_courses():
-                # Schedule Lectures
-                for _ in range(course.get_lectures_per_week()):
-                    lecture_class_times = [mt for mt in available_class_times if mt.get_duration() == TIME_SLOT_DURATION and not mt.is_within_break()]
-                    if not lecture_class_times:
-                        continue  
-                    rd.shuffle(lecture_class_times)
-                    lecture_class_time = lecture_class_times[0]
-
-                    available_rooms = self._data.get_rooms().copy()
-                    rd.shuffle(available_rooms)
-                    if not available_rooms:
-                        continue  
-                    room = available_rooms.pop()
-
-                    professor = rd.choice(course.get_professors()) if course.get_professors() else None
-                    if professor:
-                        if self._check_conflicts(lecture_class_time, room, professor):
-                            self._classes.append({
-                                "panel": self._panel.get_name(),
-                                "batch": "All",
-                                "department": dept.get_name(),
-                                "course": course.get_name(),
-                                "room": room.get_number(),
-                                "professor": professor.get_name(),
-                                "class_time": f"{lecture_class_time.get_day()} {lecture_class_time.get_time()} ({lecture_class_time.get_duration()})"
-                            })
-                            available_class_times.remove(lecture_class_time)
+    def get_fingerprint(self):
+        # XOR of one hash per (position, gene), so replacing a gene updates it in O(1)
+        if self._fingerprint is None:
+            self._fingerprint = 0
+            for i, gene in enumerate(self._classes):
+                self._fingerprint ^= _gene_hash(i, gene)
+        return self._fingerprint
 
-                for _ in range(course.get_labs_per_week()):
-                    lab_class_times = [mt for mt in available_class_times if mt.get_duration() == LAB_TIME_SLOT_DURATION and not mt.is_within_break()]
-                    if not lab_class_times:
-                        continue  
-                    rd.shuffle(lab_class_times)
-                    lab_class_time = lab_class_times[0]
-
-                    lab_courses = [c for c in dept.get_courses() if c.is_lab()] 
-                    if not lab_courses:
-                        continue 
-                    rd.shuffle(lab_courses)  
-
-                    available_lab_rooms = self._data.get_lab_rooms().copy()
-                    if len(available_lab_rooms) < self._panel.get_num_batches():
-                        raise ValueError(f"Not enough lab rooms to schedule labs for all batches in panel {self._panel.get_name()}.")
-
-                    rd.shuffle(available_lab_rooms)
-                    for batch_num in range(1, self._panel.get_num_batches() + 1):
-                        if not available_lab_rooms:
-                            break  
-                        lab_room = available_lab_rooms.pop()
-                        lab_course = lab_courses[0] 
-
-                        professor = rd.choice(lab_course.get_professors()) if lab_course.get_professors() else None
-                        if professor:
-                            if self._check_conflicts(lab_class_time, lab_room, professor):
-                                self._classes.append({
-                                    "panel": self._panel.get_name(),
-                                    "batch": f"Batch {batch_num}",
-                                    "department": dept.get_name(),
-                                    "course": f"{lab_course.get_name()} (Lab)",
-                                    "room": lab_room.get_number(),
-                                    "professor": professor.get_name(),
-                                    "class_time": f"{lab_class_time.get_day()} {lab_class_time.get_time()} ({lab_class_time.get_duration()})"
-                                })
-                                available_class_times.remove(lab_class_time)
+    def get_shared_index(self):
+        return self._shared_index
 
-        return self
+    def set_shared_index(self, shared_index):
+        self._shared_index = shared_index
+        self._is_fitness_changed = True
 
-    def _check_conflicts(self, class_time, room, professor):
-        for cls in self._classes:
-            if cls["class_time"] == f"{class_time.get_day()} {class_time.get_time()} ({class_time.get_duration()})":
-                if cls["room"] == room.get_number():
-                    return False  
+    def invalidate_fitness(self):
+        self._is_fitness_changed = True
 
-                if cls["professor"] == professor.get_name():
-                    return False  
+    def get_external_conflicts(self):
+        # Clashes with other panels' published schedules; 0 outside the multi-panel engine
+        if self._shared_index is None:
+            return 0
+        return self._shared_index.count_conflicts(self)
 
-                if cls["batch"] != "All" and cls["batch"] == "Batch":
-                    return False  
+    def set_classes(self, classes):
+        self._classes = classes
+        self._index = None
+        self._fingerprint = None
+        self._is_fitness_changed = True
 
-        return True
+    def add_class(self, gene):
+        if self._fingerprint is not None:
+            self._fingerprint ^= _gene_hash(len(self._classes), gene)
+        self._classes.append(gene)
+        if self._index is not None:
+            self._index.add(gene)
+        self._is_fitness_changed = True
+
+    def set_class(self, i, gene):
+        if self._index is not None:
+            self._index.remove(self._classes[i])
+            self._index.add(gene)
+        if self._fingerprint is not None:
+            self._fingerprint ^= _gene_hash(i, self._classes[i]) ^ _gene_hash(i, gene)
+        self._classes[i] = gene
+        self._is_fitness_changed = True
+
+    def get_conflict_index(self):
+        if self._index is None:
+            self._index = ConflictIndex(self._data)
+            for gene in self._classes:
+                self._index.add(gene)
+        return self._index
+
+    def find_free_gene(self, gene):
+        # A copy of gene moved to a free (slot, room, professor), or to a random slot if none is free
+        data = self._data
+        course = data.get_depts()[gene.dept].get_courses()[gene.course]
+        professors = [data.get_professor_id(p) for p in course.get_professors()] or [gene.professor]
+        slots = list(data.get_lab_slots() if gene.batch else data.get_lecture_slots())
+        rooms = [data.get_room_id(r) for r in (data.get_lab_rooms() if gene.batch else data.get_rooms())] or [gene.room]
+        rd.shuffle(slots)
+        rd.shuffle(rooms)
+        rd.shuffle(professors)
+        index = self.get_conflict_index()
+        shared_index = self._shared_index
+        panel = self._panel
+        index.remove(gene)
+        try:
+            # Resources are checked one at a time: O(slots x (professors + rooms)) lookups
+            for slot in slots:
+                if not index.is_batch_free(slot, gene.batch):
+                    continue
+                professor = next((p for p in professors
+                                  if index.is_within_daily_limit(p, slot) and index.is_professor_free(slot, p)
+                                  and (shared_index is None or not shared_index.count_professor_conflicts(panel, slot, p))),
+                                 None)
+                if professor is None:
+                    continue
+                for room in rooms:
+                    if index.is_room_free(slot, room) and \
+                            (shared_index is None or not shared_index.count_room_conflicts(panel, slot, room)):
+                        return Gene(gene.dept, gene.course, room, professor, gene.batch, slot)
+        finally:
+            index.add(gene)
+        return Gene(gene.dept, gene.course, rooms[0], professors[0], gene.batch, slots[0] if slots else gene.class_time)
+
+    def get_decoded_classes(self):
+        return [gene.decode(self._data, self._panel) for gene in self._classes]
+
+    def get_requirements(self):
+        # What the panel needs each week, in gene order: (dept, course, professor ids, batches).
+        # batches is 0 for a lecture (one gene) or the panel's batch count for a lab
+        # session (one gene per batch, all in the same slot).
+        requirements = []
+        rooms, lab_rooms = self._data.get_rooms(), self._data.get_lab_rooms()
+        for dept_index, dept in enumerate(self._data.get_depts()):
+            courses = dept.get_courses()
+            lab_courses = [i for i, c in enumerate(courses) if c.is_lab() and c.get_professors()]
+            for course_index, course in enumerate(courses):
+                if rooms and course.get_professors():
+                    professors = [self._data.get_professor_id(p) for p in course.get_professors()]
+                    requirements.extend([(dept_index, course_index, professors, 0)] * course.get_lectures_per_week())
+                if not lab_courses or not course.get_labs_per_week():
+                    continue
+                if len(lab_rooms) < self._panel.get_num_batches():
+                    raise InfeasibleInstanceError(f"Not enough lab rooms to schedule labs for all batches in panel {self._panel.get_name()}.")
+                for _ in range(course.get_labs_per_week()):
+                    lab_course = course_index if course_index in lab_courses else rd.choice(lab_courses)
+                    professors = [self._data.get_professor_id(p) for p in courses[lab_course].get_professors()]
+                    requirements.append((dept_index, lab_course, professors, self._panel.get_num_batches()))
+        return requirements
+
+    def initialize(self):
+        # Constructive placement with one occupancy bitmask (bit per slot) per room, professor
+        # and for the panel, most constrained requirement first. A requirement with no free
+        # (slot, room, professor) left is placed at random and left for the GA to repair.
+        data = self._data
+        masks = data.get_slot_masks()
+        days = data.get_slot_days()
+        room_ids = [data.get_room_id(room) for room in data.get_rooms()]
+        lab_room_ids = [data.get_room_id(room) for room in data.get_lab_rooms()]
+        room_busy = {}
+        professor_busy = {}
+        daily_count = {}
+        panel_busy = 0
+
+        requirements = self.get_requirements()
+        positions = []
+        position = 0
+        for requirement in requirements:
+            positions.append(position)
+            position += requirement[3] or 1
+        genes = [None] * position
+
+        order = list(range(len(requirements)))
+        rd.shuffle(order)
+        order.sort(key=lambda i: (-requirements[i][3], len(requirements[i][2])))
+
+        def free_professors(professors, slot):
+            return [p for p in professors
+                    if not professor_busy.get(p, 0) & masks[slot]
+                    and daily_count.get((p, days[slot]), 0) < data.max_classes_per_day]
+
+        for i in order:
+            dept, course, professors, batches = requirements[i]
+            needed = batches or 1
+            slots = list(data.get_lab_slots() if batches else data.get_lecture_slots())
+            if not slots:
+                continue
+            rd.shuffle(slots)
+            placement = None
+            for slot in slots:
+                if panel_busy & masks[slot]:
+                    continue
+                free_rooms = [r for r in (lab_room_ids if batches else room_ids) if not room_busy.get(r, 0) & masks[slot]]
+                available = free_professors(professors, slot)
+                if len(free_rooms) >= needed and len(available) >= needed:
+                    placement = (slot, rd.sample(free_rooms, needed), rd.sample(available, needed))
+                    break
+            if placement is None:
+                slot = slots[0]
+                placement = (slot, [rd.choice(lab_room_ids if batches else room_ids) for _ in range(needed)],
+                             [rd.choice(professors) for _ in range(needed)])
+
+            slot, rooms, chosen = placement
+            panel_busy |= 1 << slot
+            for offset in range(needed):
+                room, professor = rooms[offset], chosen[offset]
+                room_busy[room] = room_busy.get(room, 0) | 1 << slot
+                professor_busy[professor] = professor_busy.get(professor, 0) | 1 << slot
+                daily_count[(professor, days[slot])] = daily_count.get((professor, days[slot]), 0) + 1
+                genes[positions[i] + offset] = Gene(dept, course, room, professor, offset + 1 if batches else 0, slot)
+
+        self.set_classes([gene for gene in genes if gene is not None])
+        return self
+
+    def needs_fitness(self):
+        return self._is_fitness_changed
+
+    def store_fitness(self, fitness):
+        self._fitness = fitness
+        self._is_fitness_changed = False
 
     def get_fitness(self):
         if self._is_fitness_changed:
-            self._fitness = self.calculate_fitness()
+            self._fitness = 1 / (1 + self.get_conflict_index().get_penalty() + self.get_external_conflicts())
             self._is_fitness_changed = False
         return self._fitness
 
     def calculate_fitness(self):
-        conflicts = 0
-        classes = self.get_classes()
-        for i in range(len(classes)):
-            for j in range(i + 1, len(classes)):
-                classA = classes[i]
-                classB = classes[j]
-               
-                if classA["class_time"] == classB["class_time"]:
-                    if classA["room"] == classB["room"]:
-                        conflicts += 1  
-                 
-                    if classA["professor"] == classB["professor"]:
-                        conflicts += 1 
-                    
-                    if classA["batch"] == classB["batch"] and classA["batch"] != "All":
-                        conflicts += 1  
-
-        
-        if not self.calculate_daily_limits():
-            conflicts += 10  
-
-        return 1 / (1 + conflicts)
+        # Full O(n) evaluation from a freshly built index
+        self._index = None
+        return 1 / (1 + self.get_conflict_index().get_penalty() + self.get_external_conflicts())
 
     def calculate_daily_limits(self):
-        daily_class_count = {}
-        for cls in self._classes:
-            professor = cls["professor"]
-            day = cls["class_time"].split()[0]
-            key = (professor, day)
-
-            daily_class_count[key] = daily_class_count.get(key, 0) + 1
-
-            if daily_class_count[key] > self._data.max_classes_per_day:
-                return False  # Violates daily limit constraint
-        return True
+        return not self.get_conflict_index().exceeds_daily_limits()
 
 class Population:
-    def __init__(self, size, data):
+    def __init__(self, size, data, panels=None):
         self._schedules = []
         for _ in range(size):
-            for panel in data.get_panels():
+            for panel in (data.get_panels() if panels is None else panels):
                 self._schedules.append(Schedule(data, panel).initialize())
+        evaluate_population(self)
 
     def get_schedules(self):
         return self._schedules
 
+def _count_clashes(rows, resources, slots, overlaps, schedule_count):
+    # Group classes by (schedule, resource) and count them per slot. Classes clash when
+    # their slots overlap, so a group with per-slot counts n has (n.O.n - sum(n)) / 2 clashes.
+    if not len(rows):
+        return np.zeros(schedule_count, dtype=np.int64)
+    resource_count = int(resources.max()) + 1
+    groups, group_index = np.unique(rows * resource_count + resources, return_inverse=True)
+    slot_count = len(overlaps)
+    # Float counts keep the product on the BLAS path; they stay exact at these sizes
+    per_slot = np.bincount(group_index * slot_count + slots,
+                           minlength=len(groups) * slot_count).reshape(len(groups), slot_count)
+    clashes = np.rint((((per_slot @ overlaps) * per_slot).sum(axis=1) - per_slot.sum(axis=1)) / 2)
+    return np.bincount(groups // resource_count, weights=clashes, minlength=schedule_count).astype(np.int64)
+
+def _count_lecture_clashes(rows, slots, lectures, overlaps, schedule_count):
+    # Pairs of a lecture and any other overlapping class of the same schedule. With per-slot
+    # counts L (lectures) and A (all classes), L.O.A counts ordered (lecture, class) pairs,
+    # itself included and lecture pairs twice, so those are taken back out.
+    slot_count = len(overlaps)
+    shape = (schedule_count, slot_count)
+    every = np.bincount(rows * slot_count + slots, minlength=schedule_count * slot_count).reshape(shape)
+    lecture = np.bincount(rows[lectures] * slot_count + slots[lectures],
+                          minlength=schedule_count * slot_count).reshape(shape).astype(np.float64)
+    reach = lecture @ overlaps
+    own = lecture.sum(axis=1)
+    lecture_pairs = ((reach * lecture).sum(axis=1) - own) / 2
+    return np.rint((reach * every).sum(axis=1) - own - lecture_pairs).astype(np.int64)
+
+class FitnessCache:
+    # Bounded LRU map from chromosome fingerprint to fitness, so that a schedule identical to
+    # one scored before (a child copying its parent, the same child bred twice) isn't scored
+    # again. Hit and miss counts are kept for measuring it.
+    def __init__(self, max_size=FITNESS_CACHE_SIZE):
+        self._max_size = max_size
+        self._fitness = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, fingerprint):
+        fitness = self._fitness.get(fingerprint)
+        if fitness is None:
+            self._misses += 1
+            return None
+        self._fitness.move_to_end(fingerprint)
+        self._hits += 1
+        return fitness
+
+    def put(self, fingerprint, fitness):
+        self._fitness[fingerprint] = fitness
+        self._fitness.move_to_end(fingerprint)
+        if len(self._fitness) > self._max_size:
+            self._fitness.popitem(last=False)
+
+    def get_hits(self):
+        return self._hits
+
+    def get_misses(self):
+        return self._misses
+
+    def get_hit_rate(self):
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0
+
+def evaluate_population(population, cache=None):
+    # Returns how many schedules were scored; the rest kept their stored fitness or, with a
+    # FitnessCache, share a fingerprint with a schedule scored before. Schedules scored against
+    # a shared index depend on the other panels too and bypass the cache.
+    schedules = [s for s in population.get_schedules() if s.needs_fitness()]
+    if cache is None:
+        _score_schedules(schedules)
+        return len(schedules)
+    pending, repeats, scored = [], [], set()
+    for schedule in schedules:
+        if schedule.get_shared_index() is not None:
+            pending.append(schedule)
+            continue
+        fingerprint = schedule.get_fingerprint()
+        if fingerprint in scored:
+            repeats.append(schedule)
+            continue
+        fitness = cache.get(fingerprint)
+        if fitness is None:
+            scored.add(fingerprint)
+            pending.append(schedule)
+        else:
+            schedule.store_fitness(fitness)
+    _score_schedules(pending)
+    fitnesses = {}
+    for schedule in pending:
+        if schedule.get_shared_index() is None:
+            fitnesses[schedule.get_fingerprint()] = schedule.get_fitness()
+            cache.put(schedule.get_fingerprint(), schedule.get_fitness())
+    for schedule in repeats:
+        fitness = cache.get(schedule.get_fingerprint())
+        schedule.store_fitness(fitnesses[schedule.get_fingerprint()] if fitness is None else fitness)
+    return len(pending)
+
+def _score_schedules(schedules):
+    if not schedules:
+        return
+    data = schedules[0]._data
+    overlaps = data.get_slot_overlaps().astype(np.float64)
+    day_of_slot = np.asarray(data.get_slot_days(), dtype=np.int64)
+
+    # (schedules x genes) matrix of [class_time, room, professor, batch], padded with -1
+    width = max(len(s.get_classes()) for s in schedules)
+    matrix = np.full((len(schedules), max(width, 1), 4), -1, dtype=np.int64)
+    for row, schedule in enumerate(schedules):
+        classes = schedule.get_classes()
+        if classes:
+            matrix[row, :len(classes)] = [(g.class_time, g.room, g.professor, g.batch) for g in classes]
+
+    valid = matrix[:, :, 0] >= 0
+    rows = np.broadcast_to(np.arange(len(schedules))[:, None], valid.shape)[valid]
+    slots, rooms, professors, batches = (matrix[:, :, column][valid] for column in range(4))
+
+    conflicts = _count_clashes(rows, rooms, slots, overlaps, len(schedules))
+    conflicts += _count_clashes(rows, professors, slots, overlaps, len(schedules))
+    lab = batches > 0
+    conflicts += _count_clashes(rows[lab], batches[lab], slots[lab], overlaps, len(schedules))
+    conflicts += _count_lecture_clashes(rows, slots, ~lab, overlaps, len(schedules))
+
+    if len(rows):
+        day_count = len(DAYS_OF_WEEK)
+        key_count = (int(professors.max()) + 1) * day_count
+        codes, counts = np.unique(rows * key_count + professors * day_count + day_of_slot[slots], return_counts=True)
+        over_limit = np.bincount(codes[counts > data.max_classes_per_day] // key_count, minlength=len(schedules))
+        conflicts += np.where(over_limit > 0, 10, 0)
+
+    for schedule, conflict_count in zip(schedules, conflicts.tolist()):
+        schedule.store_fitness(1 / (1 + conflict_count + schedule.get_external_conflicts()))
+    return len(schedules)
+
+def population_diversity(population):
+    # Per panel and gene position, the share of schedules whose (slot, room, professor)
+    # differs from the most common one, averaged: 0 once a panel's schedules are all alike
+    by_panel = {}
+    for schedule in population.get_schedules():
+        by_panel.setdefault(id(schedule._panel), []).append(schedule.get_classes())
+    total, positions = 0, 0
+    for chromosomes in by_panel.values():
+        if len(chromosomes) < 2:
+            continue
+        for genes in zip(*chromosomes):
+            counts = {}
+            for gene in genes:
+                key = (gene.class_time, gene.room, gene.professor)
+                counts[key] = counts.get(key, 0) + 1
+            total += 1 - max(counts.values()) / len(genes)
+            positions += 1
+    return total / positions if positions else 0
+
+class SearchBudget:
+    # Wall-clock and stagnation limits of one solve; None disables a limit
+    def __init__(self, time_limit=None, stagnation_limit=None):
+        self._deadline = None if time_limit is None else time.time() + time_limit
+        self._stagnation_limit = stagnation_limit
+        self._best_fitness = None
+        self._best_generation = 0
+
+    def get_deadline(self):
+        return self._deadline
+
+    def is_out_of_time(self):
+        return self._deadline is not None and time.time() >= self._deadline
+
+    def is_exhausted(self, generation, best_fitness):
+        if self._best_fitness is None or best_fitness > self._best_fitness:
+            self._best_fitness = best_fitness
+            self._best_generation = generation
+        stagnated = self._stagnation_limit is not None and generation - self._best_generation >= self._stagnation_limit
+        return stagnated or self.is_out_of_time()
+
+class Telemetry:
+    # Per-generation GA metrics: phase timings, fitness evaluations and reuse, best/mean/worst
+    # fitness and diversity. Each record is written as a JSON line to path and/or passed to
+    # callback(record). The GA only calls into it when one is given, so leaving it out costs
+    # one None check per phase.
+    def __init__(self, path=None, callback=None):
+        self._path = path
+        self._callback = callback
+        self._file = None
+        self._generations = {}
+        self._timings = {}
+        self._evaluations = 0
+        self._reused = 0
+        self._last = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def begin_generation(self):
+        self._timings = {}
+        self._evaluations = 0
+        self._reused = 0
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        # Adds the time since the previous lap to phase
+        now = time.perf_counter()
+        self._timings[phase] = self._timings.get(phase, 0) + now - self._last
+        self._last = now
+
+    def count_evaluations(self, evaluated, reused):
+        self._evaluations += evaluated
+        self._reused += reused
+
+    def end_generation(self, population, diversity, genetic_algorithm):
+        fitnesses = [schedule.get_fitness() for schedule in population.get_schedules()]
+        lookups = self._evaluations + self._reused
+        # The multi-panel solver evolves one population per panel; each counts its own generations
+        panels = {schedule._panel.get_name() for schedule in population.get_schedules()}
+        panel = panels.pop() if len(panels) == 1 else None
+        generation = self._generations.get(panel, 0)
+        self.emit({
+            "event": "generation",
+            **({"panel": panel} if panel is not None else {}),
+            "generation": generation,
+            "schedules": len(fitnesses),
+            "timings": self._timings,
+            "seconds": sum(self._timings.values()),
+            "evaluations": self._evaluations,
+            "fitness_reuse_rate": self._reused / lookups if lookups else 0,
+            "best_fitness": max(fitnesses, default=0),
+            "mean_fitness": sum(fitnesses) / len(fitnesses) if fitnesses else 0,
+            "worst_fitness": min(fitnesses, default=0),
+            "diversity": population_diversity(population) if diversity is None else diversity,
+            "mutation_rate": genetic_algorithm.get_mutation_rate(),
+            "tournament_size": genetic_algorithm.get_tournament_size(),
+            **self._fitness_cache_counts(genetic_algorithm.get_fitness_cache()),
+        })
+        self._generations[panel] = generation + 1
+
+    def _fitness_cache_counts(self, cache):
+        # Totals since the GA started
+        if cache is None:
+            return {}
+        return {"fitness_cache_hits": cache.get_hits(), "fitness_cache_misses": cache.get_misses(),
+                "fitness_cache_hit_rate": cache.get_hit_rate()}
+
+    def emit(self, record):
+        if self._callback is not None:
+            self._callback(record)
+        if self._path is not None:
+            if self._file is None:
+                self._file = open(self._path, 'a')
+            self._file.write(json.dumps(record) + '\n')
+
 class GeneticAlgorithm:
+    def __init__(self, population_size=POPULATION_SIZE, crossover=CROSSOVER_METHOD, mutation=MUTATION_METHOD,
+                 mutation_rate=MUTATION_RATE, tournament_size=TOURNAMENT_SELECTION_SIZE,
+                 elite_size=NUMB_OF_ELITE_SCHEDULES, adaptive=ADAPTIVE_PARAMETERS, telemetry=None,
+                 fitness_cache_size=FITNESS_CACHE_SIZE):
+        if crossover not in ("uniform", "slot", "reinitialize"):
+            raise ValueError(f"Unknown crossover method: {crossover}")
+        if mutation not in ("targeted", "reinitialize"):
+            raise ValueError(f"Unknown mutation method: {mutation}")
+        self._population_size = population_size
+        self._crossover = crossover
+        self._mutation = mutation
+        self._base_mutation_rate = mutation_rate
+        self._mutation_rate = mutation_rate
+        self._base_tournament_size = tournament_size
+        self._tournament_size = tournament_size
+        self._elite_size = elite_size
+        self._adaptive = adaptive
+        self._telemetry = telemetry
+        self._fitness_cache = FitnessCache(fitness_cache_size) if fitness_cache_size else None
+
+    def get_mutation_rate(self):
+        return self._mutation_rate
+
+    def get_fitness_cache(self):
+        return self._fitness_cache
+
+    def get_tournament_size(self):
+        return self._tournament_size
+
+    def get_adaptive_state(self):
+        return self._mutation_rate, self._tournament_size
+
+    def set_adaptive_state(self, state):
+        self._mutation_rate, self._tournament_size = state
+
+    def adapt(self, diversity):
+        # A converging population mutates more under weaker selection; a diverse one
+        # the other way, within [rate / 2, MAX_MUTATION_RATE] and [2, 2 x tournament size]
+        if diversity < DIVERSITY_TARGET:
+            self._mutation_rate = min(MAX_MUTATION_RATE, self._mutation_rate * 1.5)
+            self._tournament_size = max(2, self._tournament_size - 1)
+        else:
+            self._mutation_rate = max(self._base_mutation_rate / 2, self._mutation_rate / 1.5)
+            self._tournament_size = min(2 * self._base_tournament_size, self._tournament_size + 1)
+
     def evolve(self, population):
-        return self._mutate_population(self._crossover_population(population))
+        telemetry = self._telemetry
+        if telemetry is not None:
+            telemetry.begin_generation()
+        diversity = None
+        if self._adaptive:
+            diversity = population_diversity(population)
+            self.adapt(diversity)
+            if telemetry is not None:
+                telemetry.lap("adapt")
+        population = self._crossover_population(population)
+        population = self._mutate_population(population)
+        if telemetry is not None:
+            telemetry.lap("mutation")
+        # Score every new schedule in one vectorized pass, best first for elitism
+        evaluated = evaluate_population(population, self._fitness_cache)
+        if telemetry is not None:
+            telemetry.count_evaluations(evaluated, len(population.get_schedules()) - evaluated)
+            telemetry.lap("evaluation")
+        population.get_schedules().sort(key=lambda x: x.get_fitness(), reverse=True)
+        self._improve(population)
+        if telemetry is not None:
+            telemetry.lap("sort")
+            telemetry.end_generation(population, diversity, self)
+        return population
+
+    def _improve(self, population):
+        # Hook for subclasses to refine the sorted, scored population in place
+        pass
 
     def _crossover_population(self, pop):
+        # population_size schedules per panel, as in Population, with parents drawn from the
+        # child's own panel so that no panel can drop out of the population
+        telemetry = self._telemetry
         crossover_pop = Population(0, pop.get_schedules()[0]._data)
-        # Keep elite schedules
-        crossover_pop.get_schedules().extend(pop.get_schedules()[:NUMB_OF_ELITE_SCHEDULES])
-        # Crossover rest
-        i = NUMB_OF_ELITE_SCHEDULES
-        while i < POPULATION_SIZE:
-            schedule1 = self._select_tournament_population(pop).get_schedules()[0]
-            schedule2 = self._select_tournament_population(pop).get_schedules()[0]
-            crossover_pop.get_schedules().append(self._crossover_schedule(schedule1, schedule2))
-            i += 1
+        for panel_pop in self._split_by_panel(pop):
+            # Keep elite schedules
+            elite = panel_pop.get_schedules()[:min(self._elite_size, self._population_size)]
+            crossover_pop.get_schedules().extend(elite)
+            # Crossover rest
+            i = len(elite)
+            while i < self._population_size:
+                if telemetry is not None:
+                    telemetry.lap("crossover")
+                schedule1 = self._select_tournament_population(panel_pop).get_schedules()[0]
+                schedule2 = self._select_tournament_population(panel_pop).get_schedules()[0]
+                if telemetry is not None:
+                    telemetry.lap("selection")
+                crossover_pop.get_schedules().append(self._crossover_schedule(schedule1, schedule2))
+                i += 1
+        if telemetry is not None:
+            telemetry.lap("crossover")
         return crossover_pop
 
+    def _split_by_panel(self, pop):
+        panel_pops = {}
+        for schedule in pop.get_schedules():
+            if id(schedule._panel) not in panel_pops:
+                panel_pops[id(schedule._panel)] = Population(0, schedule._data)
+            panel_pops[id(schedule._panel)].get_schedules().append(schedule)
+        return list(panel_pops.values())
+
     def _mutate_population(self, population):
-        for i in range(NUMB_OF_ELITE_SCHEDULES, POPULATION_SIZE):
-            if rd.random() < MUTATION_RATE:
-                self._mutate_schedule(population.get_schedules()[i])
+        # Each panel's block starts with its elite schedules, which are left alone
+        for i, schedule in enumerate(population.get_schedules()):
+            if i % self._population_size >= self._elite_size and rd.random() < self._mutation_rate:
+                self._mutate_schedule(schedule)
         return population
 
     def _crossover_schedule(self, schedule1, schedule2):
-        crossover_schedule = Schedule(schedule1._data, schedule1._panel).initialize()
+        if self._crossover == "reinitialize":
+            return self._reinitialize_crossover(schedule1, schedule2)
+        genes1, genes2 = schedule1.get_classes(), schedule2.get_classes()
+        crossover_schedule = Schedule(schedule1._data, schedule1._panel, schedule1.get_shared_index())
+        if schedule1._panel is not schedule2._panel or len(genes1) != len(genes2):
+            # Layouts differ, so the child is a copy of the first parent
+            crossover_schedule.set_classes(list(genes1))
+        elif self._crossover == "uniform":
+            crossover_schedule.set_classes([a if rd.random() > 0.5 else b for a, b in zip(genes1, genes2)])
+        else:
+            # Slot-aware: prefer whichever parent's gene is still free given the genes copied so far
+            crossover_schedule.get_conflict_index()
+            for a, b in zip(genes1, genes2):
+                first, second = (a, b) if rd.random() > 0.5 else (b, a)
+                index = crossover_schedule.get_conflict_index()
+                if not index.is_free(first.class_time, first.room, first.professor, first.batch) and \
+                        index.is_free(second.class_time, second.room, second.professor, second.batch):
+                    first = second
+                crossover_schedule.add_class(first)
+        return crossover_schedule
+
+    def _reinitialize_crossover(self, schedule1, schedule2):
+        crossover_schedule = Schedule(schedule1._data, schedule1._panel, schedule1.get_shared_index()).initialize()
         for i in range(len(crossover_schedule.get_classes())):
             if i < len(schedule1.get_classes()) and rd.random() > 0.5:
-                crossover_schedule.get_classes()[i] = schedule1.get_classes()[i]
+                crossover_schedule.set_class(i, schedule1.get_classes()[i])
             elif i < len(schedule2.get_classes()):
-                crossover_schedule.get_classes()[i] = schedule2.get_classes()[i]
+                crossover_schedule.set_class(i, schedule2.get_classes()[i])
         return crossover_schedule
 
     def _mutate_schedule(self, mutate_schedule):
-        # Re-initialize the schedule to introduce variation
-        mutate_schedule.initialize()
+        if self._mutation == "reinitialize":
+            # Re-initialize the schedule to introduce variation
+            mutate_schedule.initialize()
+            return
+        # Move only the genes that are in conflict; a clash-free schedule gets one random move
+        genes = mutate_schedule.get_classes()
+        targets = [i for i, gene in enumerate(genes) if self._count_gene_conflicts(mutate_schedule, gene)]
+        if not targets and genes:
+            targets = [rd.randrange(len(genes))]
+        rd.shuffle(targets)
+        for i in targets[:MUTATION_GENES]:
+            gene = mutate_schedule.get_classes()[i]
+            if self._count_gene_conflicts(mutate_schedule, gene) or len(targets) == 1:
+                mutate_schedule.set_class(i, mutate_schedule.find_free_gene(gene))
+
+    def _count_gene_conflicts(self, schedule, gene):
+        conflicts = schedule.get_conflict_index().get_gene_conflicts(gene)
+        if schedule.get_shared_index() is not None:
+            conflicts += schedule.get_shared_index().count_gene_conflicts(schedule._panel, gene)
+        return conflicts
 
     def _select_tournament_population(self, pop):
         tournament_pop = Population(0, pop.get_schedules()[0]._data)
-        for _ in range(TOURNAMENT_SELECTION_SIZE):
+        for _ in range(self._tournament_size):
             tournament_pop.get_schedules().append(pop.get_schedules()[rd.randrange(0, len(pop.get_schedules()))])
         tournament_pop.get_schedules().sort(key=lambda x: x.get_fitness(), reverse=True)
         return tournament_pop
 
+class LocalSearch:
+    # Tabu search over single-gene moves (new slot, room and professor) and slot swaps
+    # between two genes of the same kind. A candidate is scored by applying it to the
+    # schedule's ConflictIndex and undoing it, so each costs a few O(1) lookups instead
+    # of a calculate_fitness call. Moving a gene back to a slot it left less than
+    # tenure steps ago is tabu unless it beats the best penalty seen. A schedule with a
+    # shared index also counts clashes with the other panels' published schedules.
+    def __init__(self, steps=LOCAL_SEARCH_STEPS, moves=LOCAL_SEARCH_MOVES, tenure=TABU_TENURE):
+        self._steps = steps
+        self._moves = moves
+        self._tenure = tenure
+
+    def improve(self, schedule, movable=None):
+        # movable limits the search to these gene positions
+        index = schedule.get_conflict_index()
+        genes = schedule.get_classes()
+        if not genes:
+            return schedule
+        positions = range(len(genes)) if movable is None else sorted(set(movable))
+        options = self._get_options(schedule, positions)
+        shared_index = schedule.get_shared_index()
+        best_penalty = self._penalty(schedule)
+        best_genes = list(genes)
+        tabu = {}
+        for step in range(self._steps):
+            if best_penalty == 0:
+                break
+            conflicting = [i for i in positions if index.get_gene_conflicts(genes[i]) or
+                           (shared_index is not None and shared_index.count_gene_conflicts(schedule._panel, genes[i]))]
+            if not conflicting:
+                break
+            i = rd.choice(conflicting)
+            best_move = None
+            for move in self._get_moves(schedule, i, options):
+                penalty = self._score(schedule, move)
+                is_tabu = any(tabu.get((j, gene.class_time), -1) >= step for j, gene in move)
+                if is_tabu and penalty >= best_penalty:
+                    continue
+                if best_move is None or penalty < best_move[0]:
+                    best_move = (penalty, move)
+            if best_move is None:
+                continue
+            penalty, move = best_move
+            for j, gene in move:
+                tabu[(j, genes[j].class_time)] = step + self._tenure
+                schedule.set_class(j, gene)
+            if penalty < best_penalty:
+                best_penalty = penalty
+                best_genes = list(genes)
+        if self._penalty(schedule) > best_penalty:
+            schedule.set_classes(best_genes)
+        return schedule
+
+    def _penalty(self, schedule):
+        return schedule.get_conflict_index().get_penalty() + schedule.get_external_conflicts()
+
+    def _get_options(self, schedule, positions):
+        # Per kind of gene (lecture or lab): slots, rooms and the positions that may swap,
+        # plus each course's professors
+        data = schedule._data
+        genes = schedule.get_classes()
+        options = {}
+        for is_lab in (False, True):
+            slots = data.get_lab_slots() if is_lab else data.get_lecture_slots()
+            rooms = [data.get_room_id(r) for r in (data.get_lab_rooms() if is_lab else data.get_rooms())]
+            options[is_lab] = (slots, rooms, [i for i in positions if bool(genes[i].batch) == is_lab])
+        for gene in schedule.get_classes():
+            key = (gene.dept, gene.course)
+            if key not in options:
+                course = data.get_depts()[gene.dept].get_courses()[gene.course]
+                options[key] = [data.get_professor_id(p) for p in course.get_professors()]
+        return options
+
+    def _get_moves(self, schedule, i, options):
+        # Each move is a list of (gene position, new gene)
+        genes = schedule.get_classes()
+        gene = genes[i]
+        slots, rooms, same_kind = options[bool(gene.batch)]
+        professors = options[(gene.dept, gene.course)] or [gene.professor]
+        moves = []
+        for _ in range(self._moves):
+            if len(same_kind) > 1 and rd.random() < 0.5:
+                j = rd.choice(same_kind)
+                other = genes[j]
+                if j == i or other.class_time == gene.class_time:
+                    continue
+                moves.append([(i, Gene(gene.dept, gene.course, gene.room, gene.professor, gene.batch, other.class_time)),
+                              (j, Gene(other.dept, other.course, other.room, other.professor, other.batch, gene.class_time))])
+            elif slots and rooms:
+                moves.append([(i, Gene(gene.dept, gene.course, rd.choice(rooms), rd.choice(professors), gene.batch,
+                                       rd.choice(slots)))])
+        return moves
+
+    def _score(self, schedule, move):
+        genes = schedule.get_classes()
+        previous = [(j, genes[j]) for j, _ in move]
+        for j, gene in move:
+            schedule.set_class(j, gene)
+        penalty = self._penalty(schedule)
+        for j, gene in reversed(previous):
+            schedule.set_class(j, gene)
+        return penalty
+
+class MemeticAlgorithm(GeneticAlgorithm):
+    # The GA with a local search pass over the best few schedules of each panel per generation
+    def __init__(self, population_size=POPULATION_SIZE, crossover=CROSSOVER_METHOD, mutation=MUTATION_METHOD,
+                 local_search=None, schedules_per_panel=LOCAL_SEARCH_SCHEDULES, **options):
+        super().__init__(population_size, crossover, mutation, **options)
+        self._local_search = local_search or LocalSearch()
+        self._schedules_per_panel = schedules_per_panel
+
+    def _improve(self, population):
+        if self._telemetry is not None:
+            self._telemetry.lap("sort")
+        improved = {}
+        for schedule in population.get_schedules():
+            count = improved.get(id(schedule._panel), 0)
+            if count < self._schedules_per_panel and schedule.get_fitness() < 1.0:
+                self._local_search.improve(schedule)
+                improved[id(schedule._panel)] = count + 1
+        if self._telemetry is not None:
+            self._telemetry.lap("local_search")
+        population.get_schedules().sort(key=lambda x: x.get_fitness(), reverse=True)
+
+# Island workers receive Data once through the pool initializer; afterwards only
+# chromosomes, as (panel index, gene tuples), and each island's adaptive GA state
+# travel between processes.
+_island_data = None
+_island_algorithms = {}  # island index -> GeneticAlgorithm, in each worker process
+
+def _init_island_worker(data):
+    global _island_data
+    _island_data = data
+    _island_algorithms.clear()
+
+def _population_to_chromosomes(population, data):
+    panels = data.get_panels()
+    return [(panels.index(s._panel), [gene.to_tuple() for gene in s.get_classes()], s.get_fitness())
+            for s in population.get_schedules()]
+
+def _population_from_chromosomes(chromosomes, data):
+    population = Population(0, data)
+    for panel_index, genes, fitness in chromosomes:
+        schedule = Schedule(data, data.get_panels()[panel_index])
+        schedule.set_classes([Gene(*gene) for gene in genes])
+        schedule.store_fitness(fitness)
+        population.get_schedules().append(schedule)
+    return population
+
+def _evolve_island(island, chromosomes, state, generations, seed, population_size, options, deadline):
+    # Returns the island's chromosomes and adaptive state. The pool may run an island in a
+    # different process each epoch, so the state travels with the chromosomes while the
+    # GeneticAlgorithm (and its fitness cache) is kept in whichever process last ran it.
+    rd.seed(seed)
+    if chromosomes is None:
+        population = Population(population_size, _island_data)
+    else:
+        population = _population_from_chromosomes(chromosomes, _island_data)
+    genetic_algorithm = _island_algorithms.get(island)
+    if genetic_algorithm is None:
+        genetic_algorithm = _island_algorithms[island] = GeneticAlgorithm(population_size, **options)
+    if state is not None:
+        genetic_algorithm.set_adaptive_state(state)
+    for _ in range(generations):
+        population = genetic_algorithm.evolve(population)
+        if timetable_fitness(best_schedules_by_panel(population, _island_data)) == 1.0:
+            break
+        if deadline is not None and time.time() >= deadline:
+            break
+    return _population_to_chromosomes(population, _island_data), genetic_algorithm.get_adaptive_state()
+
+class IslandModel:
+    # Runs one GeneticAlgorithm per worker process and passes each island's best
+    # schedules to the next island (ring topology) every migration_interval generations.
+    def __init__(self, workers=ISLAND_WORKERS, migration_interval=MIGRATION_INTERVAL,
+                 migration_size=MIGRATION_SIZE, population_size=POPULATION_SIZE, seed=None, options=None):
+        # options are GeneticAlgorithm keyword arguments for every island. The islands split
+        # population_size between them, so more workers don't multiply the schedules evolved.
+        self._workers = workers
+        self._migration_interval = max(1, migration_interval)
+        self._migration_size = migration_size
+        self._population_size = max(min(population_size, MIN_ISLAND_POPULATION), population_size // workers)
+        self._seed = seed if seed is not None else rd.randrange(2 ** 32)
+        self._options = options or {}
+
+    def run(self, data, generations=GENERATIONS, on_migration=None, cancel=None, budget=None):
+        # Stops early once every panel has a conflict-free schedule on some island,
+        # or at the next migration after cancel (a threading.Event) is set or the
+        # budget (a SearchBudget) runs out. Islands also stop at its deadline.
+        budget = budget or SearchBudget()
+        islands = [None] * self._workers
+        states = [None] * self._workers
+        with ProcessPoolExecutor(max_workers=self._workers, initializer=_init_island_worker, initargs=(data,)) as executor:
+            generation = 0
+            while generation < generations:
+                steps = min(self._migration_interval, generations - generation)
+                # Seeds depend only on (seed, island, generation) so runs are reproducible
+                seeds = [hash((self._seed, island, generation)) for island in range(self._workers)]
+                results = list(executor.map(_evolve_island, range(self._workers), islands, states,
+                                            [steps] * self._workers, seeds, [self._population_size] * self._workers,
+                                            [self._options] * self._workers, [budget.get_deadline()] * self._workers))
+                islands = [chromosomes for chromosomes, _ in results]
+                states = [state for _, state in results]
+                generation += steps
+                best_fitness = self._timetable_fitness(islands, len(data.get_panels()))
+                if on_migration:
+                    on_migration(generation, best_fitness)
+                if best_fitness == 1.0 or budget.is_exhausted(generation, best_fitness) or \
+                        (cancel is not None and cancel.is_set()):
+                    break
+                self._migrate(islands)
+
+        population = _population_from_chromosomes([c for island in islands for c in island], data)
+        population.get_schedules().sort(key=lambda x: x.get_fitness(), reverse=True)
+        return population
+
+    def _timetable_fitness(self, islands, panel_count):
+        best = [0] * panel_count
+        for island in islands:
+            for panel_index, _, fitness in island:
+                best[panel_index] = max(best[panel_index], fitness)
+        return min(best, default=0)
+
+    def _migrate(self, islands):
+        # Islands come back sorted best-first; emigrants replace the worst schedules of the next island
+        emigrants = [island[:self._migration_size] for island in islands]
+        for i, island in enumerate(islands):
+            immigrants = emigrants[i - 1]
+            if immigrants and len(island) > len(immigrants):
+                island[-len(immigrants):] = immigrants
+
+class MultiPanelEngine:
+    # One sub-population per panel. Each panel's best schedule is published to a shared
+    # GlobalResourceIndex, so rooms and professors can't be double-booked across panels.
+    # Every round, panels that still have conflicts get generations in proportion to them.
+    def __init__(self, population_size=POPULATION_SIZE, crossover=CROSSOVER_METHOD, mutation=MUTATION_METHOD,
+                 round_generations=MULTI_PANEL_ROUND_GENERATIONS, **options):
+        self._population_size = population_size
+        self._round_generations = round_generations
+        self._crossover = crossover
+        self._mutation = mutation
+        self._options = options
+
+    def run(self, data, rounds=GENERATIONS, on_progress=None, cancel=None, initial=None, budget=None):
+        budget = budget or SearchBudget()
+        shared_index = GlobalResourceIndex(data)
+        populations = [Population(self._population_size, data, [panel]) for panel in data.get_panels()]
+        for p, population in enumerate(populations):
+            if initial and initial[p] is not None:
+                population.get_schedules()[0] = initial[p]
+                evaluate_population(population)
+            population.get_schedules().sort(key=lambda x: x.get_fitness(), reverse=True)
+            shared_index.publish(population.get_schedules()[0])
+        for population in populations:
+            for schedule in population.get_schedules():
+                schedule.set_shared_index(shared_index)
+        # One GA per panel, so each keeps its own adaptive mutation rate and tournament size
+        genetic_algorithms = [GeneticAlgorithm(self._population_size, self._crossover, self._mutation, **self._options)
+                              for _ in populations]
+
+        for round_number in range(rounds):
+            conflicts = [self._count_conflicts(population) for population in populations]
+            best_fitness = 1 / (1 + max(conflicts, default=0))
+            if on_progress:
+                on_progress(round_number, best_fitness)
+            if not any(conflicts) or budget.is_exhausted(round_number, best_fitness) or \
+                    (cancel is not None and cancel.is_set()):
+                break
+            generations = self._round_generations * sum(1 for c in conflicts if c)
+            for p, population in enumerate(populations):
+                if not conflicts[p]:
+                    continue
+                # Other panels may have published since this sub-population was scored
+                for schedule in population.get_schedules():
+                    schedule.invalidate_fitness()
+                evaluate_population(population)
+                population.get_schedules().sort(key=lambda x: x.get_fitness(), reverse=True)
+                for _ in range(max(1, round(generations * conflicts[p] / sum(conflicts)))):
+                    population = genetic_algorithms[p].evolve(population)
+                    if population.get_schedules()[0].get_fitness() == 1.0 or budget.is_out_of_time():
+                        break
+                populations[p] = population
+                shared_index.publish(population.get_schedules()[0])
+
+        best = [population.get_schedules()[0] for population in populations]
+        for schedule in best:
+            schedule.invalidate_fitness()
+        return best
+
+    def _count_conflicts(self, population):
+        best = population.get_schedules()[0]
+        best.invalidate_fitness()
+        return best.get_conflict_index().get_penalty() + best.get_external_conflicts()
+
+class ExactSolver:
+    # Graph colouring of the conflict graph by backtracking search. Every class (a lecture, or
+    # one batch's lab) is a vertex coloured with a timeslot and a professor. Rooms and
+    # professors are shared by all panels, a panel's lectures overlap none of its classes, labs
+    # of the same batch of a panel can't overlap, and a professor's day holds at most
+    # max_classes_per_day classes. The next class is the one
+    # with the fewest slots left (DSATUR), and forward checking removes slots each assignment
+    # rules out from the domains of the classes it touches. Rooms only limit how many classes
+    # of a kind may overlap; as room intervals form an interval graph they are matched to
+    # classes after the search by interval partitioning, which always succeeds within that limit.
+    def __init__(self, node_limit=EXACT_NODE_LIMIT):
+        self._node_limit = node_limit
+
+    def solve(self, data, budget=None):
+        # Conflict-free schedules, one per panel in data.get_panels() order. Raises
+        # InfeasibleInstanceError when none exist; if node_limit or the budget runs out
+        # first, the deepest partial colouring is completed by local search instead, and
+        # clashes it leaves between panels count in the schedules' fitness.
+        self._budget = budget or SearchBudget()
+        self._build(data)
+        self._check_capacity()
+        colouring = self._search()
+        return self._to_schedules(colouring)
+
+    def _build(self, data):
+        self._data = data
+        starts, ends, days = data.get_slot_starts(), data.get_slot_ends(), data.get_slot_days()
+        masks = data.get_slot_masks()
+        self._masks = masks
+        self._days = days
+        # Room load is tracked at every distinct (day, start): the most classes that overlap
+        # at any time is reached at one of their start times
+        points = sorted(set(zip(days, starts)))
+        point_ids = {point: i for i, point in enumerate(points)}
+        self._covers = [[point_ids[(day, start)] for day, start in points
+                         if day == days[slot] and starts[slot] <= start < ends[slot]]
+                        for slot in range(len(starts))]
+        self._capacity = {False: len(data.get_rooms()), True: len(data.get_lab_rooms())}
+        self._load = {False: [0] * len(points), True: [0] * len(points)}
+
+        # One node per gene, in Schedule.get_requirements() gene order for every panel
+        self._nodes = []
+        self._panel_positions = []
+        for panel_index, panel in enumerate(data.get_panels()):
+            positions = []
+            for dept, course, professors, batches in Schedule(data, panel).get_requirements():
+                for batch in (range(1, batches + 1) if batches else [0]):
+                    positions.append(len(self._nodes))
+                    self._nodes.append((panel_index, dept, course, batch, sorted(set(professors))))
+            self._panel_positions.append(positions)
+        self._domains = [set(data.get_lab_slots() if node[3] else data.get_lecture_slots()) for node in self._nodes]
+        self._by_kind = {False: [], True: []}
+        self._by_professor = {}
+        self._by_batch = {}
+        self._by_panel = {}
+        for i, (panel_index, _, _, batch, professors) in enumerate(self._nodes):
+            self._by_kind[bool(batch)].append(i)
+            self._by_panel.setdefault(panel_index, []).append(i)
+            for professor in professors:
+                self._by_professor.setdefault(professor, []).append(i)
+            if batch:
+                self._by_batch.setdefault((panel_index, batch), []).append(i)
+        self._professor_busy = {}
+        self._daily = {}
+        self._batch_busy = {}
+        self._panel_busy = {}  # slots of a panel's lectures, which every batch attends
+        self._colouring = {}
+
+    def _check_capacity(self):
+        # Counting bounds that prove infeasibility before any search
+        for is_lab in (False, True):
+            nodes = self._by_kind[is_lab]
+            if not nodes:
+                continue
+            slots = self._data.get_lab_slots() if is_lab else self._data.get_lecture_slots()
+            if not slots or not self._capacity[is_lab]:
+                raise InfeasibleInstanceError(f"No {'lab ' if is_lab else ''}rooms or timeslots for "
+                                              f"{len(nodes)} {'labs' if is_lab else 'lectures'}.")
+            # A room holds at most as many classes a week as there are disjoint slots
+            per_room = self._count_disjoint_slots(slots)
+            if len(nodes) > self._capacity[is_lab] * per_room:
+                raise InfeasibleInstanceError(f"{len(nodes)} {'labs' if is_lab else 'lectures'} don't fit in "
+                                              f"{self._capacity[is_lab]} {'lab ' if is_lab else ''}rooms "
+                                              f"({per_room} classes a week each).")
+        # A batch attends its panel's lectures and its own labs, none of which overlap
+        slots = self._data.get_lecture_slots() + self._data.get_lab_slots()
+        per_batch = self._count_disjoint_slots(slots)
+        for panel_index, nodes in self._by_panel.items():
+            lectures = sum(1 for i in nodes if not self._nodes[i][3])
+            labs = {}
+            for i in nodes:
+                if self._nodes[i][3]:
+                    labs[self._nodes[i][3]] = labs.get(self._nodes[i][3], 0) + 1
+            batch, most_labs = max(labs.items(), key=lambda item: item[1], default=(None, 0))
+            if lectures + most_labs > per_batch:
+                panel = self._data.get_panels()[panel_index].get_name()
+                attendee = f"batch {batch} of panel {panel}" if batch else f"panel {panel}"
+                raise InfeasibleInstanceError(f"Only {per_batch} classes fit in a week, but {attendee} has "
+                                              f"{lectures} lectures and {most_labs} labs.")
+        limit = self._data.max_classes_per_day * len(DAYS_OF_WEEK)
+        assigned = self._match_professors(limit)
+        if assigned < len(self._nodes):
+            raise InfeasibleInstanceError(f"The professors can teach at most {assigned} of the {len(self._nodes)} "
+                                          f"classes within {limit} classes a week each.")
+        for i in range(len(self._nodes)):
+            self._domains[i] = {slot for slot in self._domains[i] if self._is_feasible(i, slot)}
+            if not self._domains[i]:
+                raise InfeasibleInstanceError(f"No timeslot can hold {self._describe(i)}.")
+
+    def _count_disjoint_slots(self, slots):
+        # Most slots without overlaps, per day by earliest end first
+        starts, ends = self._data.get_slot_starts(), self._data.get_slot_ends()
+        count = 0
+        for day in set(self._days[slot] for slot in slots):
+            end = None
+            for slot in sorted((s for s in slots if self._days[s] == day), key=lambda s: ends[s]):
+                if end is None or starts[slot] >= end:
+                    count += 1
+                    end = ends[slot]
+        return count
+
+    def _match_professors(self, limit):
+        # Largest number of classes that get one of their professors, each professor taking at
+        # most limit classes (bipartite b-matching by augmenting paths)
+        taken = {}
+
+        def augment(i, seen):
+            for professor in self._nodes[i][4]:
+                if professor in seen:
+                    continue
+                seen.add(professor)
+                classes = taken.setdefault(professor, [])
+                if len(classes) < limit:
+                    classes.append(i)
+                    return True
+                for j in classes:
+                    if augment(j, seen):
+                        classes.remove(j)
+                        classes.append(i)
+                        return True
+            return False
+
+        return sum(1 for i in range(len(self._nodes)) if augment(i, set()))
+
+    def _describe(self, i):
+        panel_index, dept, course, batch, _ = self._nodes[i]
+        name = self._data.get_depts()[dept].get_courses()[course].get_name()
+        panel = self._data.get_panels()[panel_index].get_name()
+        return f"{name} (Lab, Batch {batch})" if batch else f"{name} for panel {panel}"
+
+    def _free_professors(self, i, slot):
+        day = self._days[slot]
+        return [p for p in self._nodes[i][4]
+                if not self._professor_busy.get(p, 0) & self._masks[slot]
+                and self._daily.get((p, day), 0) < self._data.max_classes_per_day]
+
+    def _is_feasible(self, i, slot):
+        panel_index, _, _, batch, _ = self._nodes[i]
+        load, capacity = self._load[bool(batch)], self._capacity[bool(batch)]
+        if any(load[point] >= capacity for point in self._covers[slot]):
+            return False
+        busy = self._panel_busy.get(panel_index, 0)
+        if batch:
+            busy |= self._batch_busy.get((panel_index, batch), 0)
+        else:
+            for b in range(1, self._data.get_panels()[panel_index].get_num_batches() + 1):
+                busy |= self._batch_busy.get((panel_index, b), 0)
+        if busy & self._masks[slot]:
+            return False
+        return bool(self._free_professors(i, slot))
+
+    def _select(self):
+        # DSATUR: the uncoloured class with the fewest slots left, then the fewest professors
+        best, best_key = None, None
+        for i, domain in enumerate(self._domains):
+            if i in self._colouring:
+                continue
+            key = (len(domain), len(self._nodes[i][4]))
+            if best_key is None or key < best_key:
+                best, best_key = i, key
+        return best
+
+    def _values(self, i):
+        # Least loaded slots first, shuffled among equals, and the professor who can
+        # teach the fewest other classes first
+        is_lab = bool(self._nodes[i][3])
+        load = self._load[is_lab]
+        slots = list(self._domains[i])
+        rd.shuffle(slots)
+        slots.sort(key=lambda slot: max(load[point] for point in self._covers[slot]))
+        return [(slot, professor) for slot in slots
+                for professor in sorted(self._free_professors(i, slot), key=lambda p: len(self._by_professor[p]))]
+
+    def _assign(self, i, slot, professor, trail):
+        # Colours class i and forward-checks; returns False once some domain is empty.
+        # Everything changed is pushed on trail for _undo.
+        panel_index, _, _, batch, _ = self._nodes[i]
+        is_lab = bool(batch)
+        day = self._days[slot]
+        self._colouring[i] = (slot, professor)
+        self._professor_busy[professor] = self._professor_busy.get(professor, 0) | 1 << slot
+        self._daily[(professor, day)] = self._daily.get((professor, day), 0) + 1
+        if batch:
+            self._batch_busy[(panel_index, batch)] = self._batch_busy.get((panel_index, batch), 0) | 1 << slot
+        else:
+            self._panel_busy[panel_index] = self._panel_busy.get(panel_index, 0) | 1 << slot
+        load = self._load[is_lab]
+        for point in self._covers[slot]:
+            load[point] += 1
+        trail.append(("colour", i))
+
+        touched = set(self._by_professor[professor])
+        if batch:
+            touched.update(self._by_batch[(panel_index, batch)])
+            touched.update(j for j in self._by_panel[panel_index] if not self._nodes[j][3])
+        else:
+            touched.update(self._by_panel[panel_index])
+        if any(load[point] >= self._capacity[is_lab] for point in self._covers[slot]):
+            touched.update(self._by_kind[is_lab])
+        day_full = self._daily[(professor, day)] >= self._data.max_classes_per_day
+        for j in touched:
+            if j in self._colouring:
+                continue
+            domain = self._domains[j]
+            for other in [s for s in domain if self._masks[slot] >> s & 1 or (day_full and self._days[s] == day)]:
+                if not self._is_feasible(j, other):
+                    domain.discard(other)
+                    trail.append(("domain", j, other))
+            if not domain:
+                return False
+        return True
+
+    def _undo(self, trail, mark):
+        while len(trail) > mark:
+            entry = trail.pop()
+            if entry[0] == "domain":
+                self._domains[entry[1]].add(entry[2])
+                continue
+            i = entry[1]
+            slot, professor = self._colouring.pop(i)
+            panel_index, _, _, batch, _ = self._nodes[i]
+            self._professor_busy[professor] &= ~(1 << slot)
+            self._daily[(professor, self._days[slot])] -= 1
+            if batch:
+                self._batch_busy[(panel_index, batch)] &= ~(1 << slot)
+            else:
+                self._panel_busy[panel_index] &= ~(1 << slot)
+            for point in self._covers[slot]:
+                self._load[bool(batch)][point] -= 1
+
+    def _search(self):
+        # Restarts with a doubling node cutoff and fresh random tie-breaks, since one unlucky early
+        # choice can trap a backtracking search; a run that finishes below its cutoff is exhaustive
+        deepest = {}
+        cutoff = EXACT_RESTART_NODES
+        nodes = 0
+        while nodes < self._node_limit and not self._budget.is_out_of_time():
+            colouring, explored, complete = self._backtrack(min(cutoff, self._node_limit - nodes))
+            nodes += explored
+            if complete:
+                if colouring is None:
+                    raise InfeasibleInstanceError("No conflict-free timetable exists: every assignment of "
+                                                  "timeslots and professors leaves a clash.")
+                return colouring
+            if len(colouring) > len(deepest):
+                deepest = colouring
+            cutoff *= 2
+        return deepest
+
+    def _backtrack(self, cutoff):
+        # Iterative backtracking (the search can be as deep as there are classes). Each frame is
+        # [class, values, next value, trail mark of its current assignment or None]. Returns
+        # (colouring, nodes explored, whether the search finished): a full colouring, None
+        # when the search space is exhausted, or the deepest partial colouring at the cutoff.
+        trail = []
+        deepest = {}
+        first = self._select()
+        if first is None:
+            return {}, 0, True
+        stack = [[first, self._values(first), 0, None]]
+        nodes = 0
+        try:
+            while stack:
+                frame = stack[-1]
+                if frame[3] is not None:
+                    self._undo(trail, frame[3])
+                    frame[3] = None
+                if frame[2] == len(frame[1]):
+                    stack.pop()
+                    continue
+                if nodes >= cutoff or (nodes % 1000 == 0 and self._budget.is_out_of_time()):
+                    return deepest, nodes, False
+                slot, professor = frame[1][frame[2]]
+                frame[2] += 1
+                frame[3] = len(trail)
+                nodes += 1
+                if not self._assign(frame[0], slot, professor, trail):
+                    continue
+                if len(self._colouring) > len(deepest):
+                    deepest = dict(self._colouring)
+                following = self._select()
+                if following is None:
+                    return dict(self._colouring), nodes, True
+                stack.append([following, self._values(following), 0, None])
+            return None, nodes, True
+        finally:
+            self._undo(trail, 0)
+
+    def _to_schedules(self, colouring):
+        data = self._data
+        slot_rooms = self._match_rooms(colouring)
+        room_ids = {False: [data.get_room_id(r) for r in data.get_rooms()],
+                    True: [data.get_room_id(r) for r in data.get_lab_rooms()]}
+        schedules, movable = [], []
+        for panel, positions in zip(data.get_panels(), self._panel_positions):
+            schedule = Schedule(data, panel)
+            missing = []
+            for i in positions:
+                _, dept, course, batch, professors = self._nodes[i]
+                if i in colouring:
+                    slot, professor = colouring[i]
+                    schedule.add_class(Gene(dept, course, slot_rooms[i], professor, batch, slot))
+                else:
+                    slots = data.get_lab_slots() if batch else data.get_lecture_slots()
+                    missing.append(len(schedule.get_classes()))
+                    schedule.add_class(Gene(dept, course, room_ids[bool(batch)][0], professors[0], batch, slots[0]))
+            schedules.append(schedule)
+            movable.append(missing)
+        # Only reached when the search gave up: the rest is placed against every panel, and
+        # the schedules keep the shared index so clashes left behind lower their fitness
+        if any(movable):
+            place_across_panels(schedules, movable)
+        return schedules
+
+    def _match_rooms(self, colouring):
+        # Interval partitioning per kind of room: classes by start time, each into a room that is
+        # free by then. Never needs more rooms than the most classes overlapping at one time.
+        data = self._data
+        starts, ends = data.get_slot_starts(), data.get_slot_ends()
+        rooms = {}
+        for is_lab, room_list in ((False, data.get_rooms()), (True, data.get_lab_rooms())):
+            room_ids = [data.get_room_id(r) for r in room_list]
+            classes = sorted((i for i in colouring if bool(self._nodes[i][3]) == is_lab),
+                             key=lambda i: (self._days[colouring[i][0]], starts[colouring[i][0]]))
+            free_at = {}
+            for i in classes:
+                slot = colouring[i][0]
+                day, start = self._days[slot], starts[slot]
+                room = next(r for r in room_ids if free_at.get(r, (-1, 0)) <= (day, start))
+                free_at[room] = (day, ends[slot])
+                rooms[i] = room
+        return rooms
+
+class SolverConfig:
+    # Per-run solver settings; defaults come from the module constants. population_size is
+    # schedules per panel in total: island workers split it (see IslandModel).
+    def __init__(self, population_size=POPULATION_SIZE, generations=GENERATIONS,
+                 crossover=CROSSOVER_METHOD, mutation=MUTATION_METHOD, workers=ISLAND_WORKERS,
+                 migration_interval=MIGRATION_INTERVAL, migration_size=MIGRATION_SIZE, seed=None, solver="ga",
+                 time_limit=TIME_LIMIT, stagnation_limit=STAGNATION_LIMIT, mutation_rate=MUTATION_RATE,
+                 tournament_size=TOURNAMENT_SELECTION_SIZE, elite_size=NUMB_OF_ELITE_SCHEDULES,
+                 adaptive=ADAPTIVE_PARAMETERS, fitness_cache_size=FITNESS_CACHE_SIZE):
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {solver}")
+        for name, value, minimum in (("population_size", population_size, 1), ("generations", generations, 1),
+                                     ("workers", workers, 1), ("migration_interval", migration_interval, 1),
+                                     ("migration_size", migration_size, 0), ("tournament_size", tournament_size, 1),
+                                     ("elite_size", elite_size, 0), ("fitness_cache_size", fitness_cache_size, 0),
+                                     ("stagnation_limit", stagnation_limit, 1)):
+            if value is not None and value < minimum:
+                raise ValueError(f"{name} must be at least {minimum}, not {value}")
+        if elite_size > population_size:
+            raise ValueError(f"elite_size ({elite_size}) can't exceed population_size ({population_size})")
+        if not 0 <= mutation_rate <= 1:
+            raise ValueError(f"mutation_rate must be between 0 and 1, not {mutation_rate}")
+        if time_limit is not None and time_limit <= 0:
+            raise ValueError(f"time_limit must be positive, not {time_limit}")
+        self.population_size = population_size
+        self.generations = generations
+        self.crossover = crossover
+        self.mutation = mutation
+        self.workers = workers
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.seed = seed
+        self.solver = solver
+        self.time_limit = time_limit
+        self.stagnation_limit = stagnation_limit
+        self.mutation_rate = mutation_rate
+        self.tournament_size = tournament_size
+        self.elite_size = elite_size
+        self.adaptive = adaptive
+        self.fitness_cache_size = fitness_cache_size
+
+    def to_dict(self):
+        return dict(vars(self))
+
+    def get_algorithm_options(self):
+        # GeneticAlgorithm keyword arguments
+        return {"crossover": self.crossover, "mutation": self.mutation, "mutation_rate": self.mutation_rate,
+                "tournament_size": self.tournament_size, "elite_size": self.elite_size, "adaptive": self.adaptive,
+                "fitness_cache_size": self.fitness_cache_size}
+
+    def create_budget(self):
+        return SearchBudget(self.time_limit, self.stagnation_limit)
+
+    @classmethod
+    def from_dict(cls, values):
+        unknown = set(values) - set(vars(cls()))
+        if unknown:
+            raise ValueError(f"Unknown solver settings: {', '.join(sorted(unknown))}")
+        return cls(**values)
+
+def best_schedules_by_panel(population, data):
+    best = []
+    for panel in data.get_panels():
+        panel_schedules = [s for s in population.get_schedules() if s._panel is panel]
+        best.append(max(panel_schedules, key=lambda s: s.get_fitness()) if panel_schedules else None)
+    return best
+
+def timetable_fitness(schedules):
+    # A timetable is only as good as its worst panel; a panel without a schedule scores 0
+    return min((s.get_fitness() if s else 0 for s in schedules), default=0)
+
+def solve(data, config=None, on_progress=None, cancel=None, cache=None, telemetry=None):
+    # Runs the GA headlessly and returns the best schedule for each panel, in
+    # data.get_panels() order (None for a panel without schedules).
+    # on_progress(generation, best_fitness) is called as the search advances;
+    # setting cancel (a threading.Event) stops early with the best found so far.
+    # With a ResultCache, solved repeats are answered from disk and instances
+    # with the same course/panel layout start from the cached timetable.
+    # A Telemetry records per-generation metrics of the serial and multi-panel
+    # solvers (island workers run in other processes and don't report).
+    config = config or SolverConfig()
+    initial = None
+    if cache is not None:
+        cached = cache.get(data, config)
+        if telemetry is not None:
+            telemetry.emit({"event": "result_cache", "hit": cached is not None})
+        if cached is not None:
+            if config.solver == "multipanel":
+                share_resources(cached, data)
+            if on_progress:
+                on_progress(0, timetable_fitness(cached))
+            return cached
+        initial = cache.get_warm_start(data)
+    schedules = _solve(data, config, on_progress, cancel, initial, telemetry)
+    if cache is not None and not (cancel is not None and cancel.is_set()):
+        cache.put(data, config, schedules)
+    return schedules
+
+def _solve(data, config, on_progress, cancel, initial, telemetry=None):
+    if config.seed is not None:
+        rd.seed(config.seed)
+    budget = config.create_budget()
+    options = config.get_algorithm_options()
+    if config.solver == "exact":
+        schedules = ExactSolver().solve(data, budget)
+        if on_progress:
+            on_progress(0, timetable_fitness(schedules))
+        return schedules
+    if config.solver == "multipanel":
+        engine = MultiPanelEngine(config.population_size, telemetry=telemetry, **options)
+        return engine.run(data, config.generations, on_progress, cancel, initial, budget)
+    if config.workers > 1 and config.solver == "ga":
+        island_model = IslandModel(config.workers, config.migration_interval, config.migration_size,
+                                   config.population_size, config.seed, options)
+        population = island_model.run(data, config.generations, on_progress, cancel, budget)
+        return best_schedules_by_panel(population, data)
+
+    start = time.perf_counter()
+    population = Population(config.population_size, data)
+    if initial:
+        warm = [schedule for schedule in initial if schedule is not None]
+        population.get_schedules()[:len(warm)] = warm
+        evaluate_population(population)
+    if telemetry is not None:
+        telemetry.emit({"event": "initialize", "schedules": len(population.get_schedules()),
+                        "warm_start": bool(initial), "seconds": time.perf_counter() - start})
+    algorithm = MemeticAlgorithm if config.solver == "memetic" else GeneticAlgorithm
+    genetic_algorithm = algorithm(config.population_size, telemetry=telemetry, **options)
+    for generation in range(config.generations):
+        population = genetic_algorithm.evolve(population)
+        best_fitness = timetable_fitness(best_schedules_by_panel(population, data))
+        if on_progress:
+            on_progress(generation, best_fitness)
+        if best_fitness == 1.0 or budget.is_exhausted(generation, best_fitness) or \
+                (cancel is not None and cancel.is_set()):
+            break
+    return best_schedules_by_panel(population, data)
+
+def diff_data(old, new):
+    # What changed between two instances, by name: rooms, lab rooms, professors, courses
+    # ("Department/Course") and panels that were added or removed, plus courses and panels
+    # whose settings changed. Empty lists everywhere means nothing to repair.
+    def rooms(rooms):
+        return {room.get_number() for room in rooms}
+
+    def professors(professors):
+        return {professor.get_name() for professor in professors}
+
+    def courses(data):
+        return {f"{dept['name']}/{course['name']}": course
+                for dept in data_to_dict(data)["departments"] for course in dept["courses"]}
+
+    def panels(data):
+        return {panel.get_name(): panel.get_num_batches() for panel in data.get_panels()}
+
+    diff = {}
+    for key, old_items, new_items in (("rooms", rooms(old.get_rooms()), rooms(new.get_rooms())),
+                                      ("lab_rooms", rooms(old.get_lab_rooms()), rooms(new.get_lab_rooms())),
+                                      ("professors", professors(old.get_professors()), professors(new.get_professors()))):
+        diff[f"{key}_added"] = sorted(new_items - old_items)
+        diff[f"{key}_removed"] = sorted(old_items - new_items)
+    for key, old_items, new_items in (("courses", courses(old), courses(new)), ("panels", panels(old), panels(new))):
+        diff[f"{key}_added"] = sorted(set(new_items) - set(old_items))
+        diff[f"{key}_removed"] = sorted(set(old_items) - set(new_items))
+        diff[f"{key}_changed"] = sorted(name for name in set(old_items) & set(new_items)
+                                        if old_items[name] != new_items[name])
+    if old.max_classes_per_day != new.max_classes_per_day:
+        diff["max_classes_per_day"] = new.max_classes_per_day
+    return diff
+
+def repair(previous, data, local_search=None):
+    # Fits previous schedules (one per panel, built on the old or the new Data) to data while
+    # moving as few classes as possible. Classes are matched to the new requirements by name
+    # (encode_classes); a class whose room, professor, course or time is gone, and each new
+    # requirement, is put in a (slot, room, professor) free in its panel and in every other
+    # panel. Local search then moves only those classes, and all of a panel's classes if
+    # clashes remain (see place_across_panels). Returns one schedule per panel, in
+    # data.get_panels() order, scored against the other panels.
+    by_name = {schedule._panel.get_name(): schedule for schedule in previous if schedule is not None}
+    room_ids = [data.get_room_id(room) for room in data.get_rooms()]
+    lab_room_ids = [data.get_room_id(room) for room in data.get_lab_rooms()]
+    schedules, movable = [], []
+    for panel in data.get_panels():
+        schedule = Schedule(data, panel)
+        kept = {}
+        if panel.get_name() in by_name:
+            for gene in encode_classes(by_name[panel.get_name()].get_decoded_classes(), data, panel):
+                if gene is not None:
+                    kept.setdefault((gene.dept, gene.course, gene.batch), []).append(gene)
+
+        genes, replaced = [], []
+        for dept, course, professors, batches in schedule.get_requirements():
+            for batch in (range(1, batches + 1) if batches else [0]):
+                matches = kept.get((dept, course, batch))
+                if matches:
+                    genes.append(matches.pop(0))
+                    continue
+                slots = data.get_lab_slots() if batch else data.get_lecture_slots()
+                rooms = lab_room_ids if batch else room_ids
+                if not slots or not rooms:
+                    continue
+                replaced.append(len(genes))
+                genes.append(Gene(dept, course, rooms[0], professors[0], batch, slots[0]))
+        # A lab session of a course without its own lab picks one of the department's lab
+        # courses at random, so a replaced lab may still match a kept lab of a sibling course
+        for i in list(replaced):
+            gene = genes[i]
+            if gene.batch:
+                sibling = next((key for key, matches in kept.items()
+                                if matches and key[0] == gene.dept and key[2] == gene.batch), None)
+                if sibling is not None:
+                    genes[i] = kept[sibling].pop(0)
+                    replaced.remove(i)
+
+        schedule.set_classes(genes)
+        schedules.append(schedule)
+        movable.append(replaced)
+    return place_across_panels(schedules, movable, local_search) if schedules else schedules
+
+class SolveJob:
+    # Runs solve() on a daemon thread so a UI can poll progress, cancel, and
+    # pick up the result later (e.g. across Streamlit reruns). Given previous
+    # schedules, it runs repair() on them instead.
+    def __init__(self, data, config=None, cache=None, previous=None):
+        self._data = data
+        self._config = config or SolverConfig()
+        self._cache = cache
+        self._previous = previous
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._best_fitness = 0
+        self._started_at = None
+        self._finished_at = None
+        self._result = None
+        self._error = None
+
+    def start(self):
+        self._started_at = time.monotonic()
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_running(self):
+        return self._thread.is_alive()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def get_data(self):
+        return self._data
+
+    def get_result(self):
+        return self._result
+
+    def get_error(self):
+        return self._error
+
+    def get_progress(self):
+        with self._lock:
+            generation, best_fitness = self._generation, self._best_fitness
+        end = self._finished_at or time.monotonic()
+        elapsed = end - self._started_at if self._started_at else 0
+        return {
+            "generation": generation,
+            "best_fitness": best_fitness,
+            "elapsed": elapsed,
+            "generations_per_second": generation / elapsed if elapsed else 0,
+        }
+
+    def _on_progress(self, generation, best_fitness):
+        with self._lock:
+            self._generation = generation + 1 if self._config.workers == 1 else generation
+            self._best_fitness = best_fitness
+
+    def _run(self):
+        try:
+            if self._previous is not None:
+                self._result = repair(self._previous, self._data)
+                self._on_progress(0, timetable_fitness(self._result))
+                return
+            self._result = solve(self._data, self._config, self._on_progress, self._cancel, self._cache)
+        except Exception as error:
+            self._error = error
+        finally:
+            self._finished_at = time.monotonic()
+
+def data_from_dict(instance):
+    # Builds Data from the JSON instance layout used by the CLI:
+    # {"max_classes_per_day", "rooms", "lab_rooms", "professors", "departments", "panels"}
+    if not isinstance(instance, dict):
+        raise ValueError(f"Instance must be a JSON object, not {type(instance).__name__}.")
+    data = Data()
+    data.max_classes_per_day = int(instance.get("max_classes_per_day", data.max_classes_per_day))
+    for number in instance.get("rooms", []):
+        data.add_room(Room(str(number)))
+    for number in instance.get("lab_rooms", []):
+        data.add_lab_room(Room(str(number)))
+    data.generate_class_times()
+
+    professors = {}
+    for i, professor in enumerate(instance.get("professors", [])):
+        if isinstance(professor, str):
+            professor = {"id": f"I{i + 1}", "name": professor}
+        _record_name(professor, f"Professor {i + 1}")
+        professors[professor["name"]] = Professor(professor.get("id", f"I{i + 1}"), professor["name"])
+        data.add_professor(professors[professor["name"]])
+
+    for i, dept in enumerate(instance.get("departments", [])):
+        _record_name(dept, f"Department {i + 1}")
+        courses = []
+        for j, course in enumerate(dept.get("courses", [])):
+            _record_name(course, f"Course {j + 1} of department {dept['name']}")
+            missing = [name for name in course.get("professors", []) if name not in professors]
+            if missing:
+                raise ValueError(f"Course {course['name']} refers to unknown professors: {', '.join(missing)}")
+            course_type = course.get("type", "lecture")
+            if course_type not in ("lecture", "lab"):
+                raise ValueError(f"Course {course['name']} has unknown type {course_type!r}.")
+            courses.append(Course(course.get("number", f"C{j + 1}"), course["name"], course_type,
+                                  [professors[name] for name in course.get("professors", [])],
+                                  int(course.get("lectures_per_week", 3)),
+                                  int(course.get("labs_per_week", 1 if course_type == "lab" else 0))))
+        data.add_dept(Department(dept["name"], courses))
+
+    for i, panel in enumerate(instance.get("panels", [])):
+        _record_name(panel, f"Panel {i + 1}")
+        batches = int(panel.get("batches", 1))
+        if batches < 1:
+            raise ValueError(f"Panel {panel['name']} must have at least 1 batch, not {batches}.")
+        data.add_panel(Panel(panel["name"], batches))
+    return data
+
+def _record_name(record, description):
+    if not isinstance(record, dict) or not record.get("name"):
+        raise ValueError(f"{description} must be an object with a name.")
+
+def read_table(source):
+    # One table from a CSV or JSON (list of records) path or uploaded file
+    import pandas as pd
+
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    if name.lower().endswith(".json"):
+        return pd.read_json(source, orient="records", dtype=False)
+    return pd.read_csv(source, dtype=str, keep_default_na=False, skipinitialspace=True)
+
+def _require_columns(frame, table, columns):
+    missing = [column for column in columns if column not in frame.columns]
+    if missing:
+        raise ValueError(f"{table} table is missing columns: {', '.join(missing)}")
+
+def _text_column(frame, column, default=""):
+    import pandas as pd
+
+    if column not in frame.columns:
+        return pd.Series(default, index=frame.index, dtype=object)
+    return frame[column].fillna(default).astype(str).str.strip()
+
+def _count_column(frame, table, column, default, minimum=0):
+    # default may be a Series aligned with frame, for a per-row default of blank cells
+    import pandas as pd
+
+    if column not in frame.columns:
+        return pd.Series(default, index=frame.index, dtype=int)
+    blank = frame[column].isna() | (frame[column].astype(str).str.strip() == "")
+    values = pd.to_numeric(frame[column].mask(blank, default), errors="coerce")
+    bad = values.isna() | (values < minimum) | (values != values.round())
+    if bad.any():
+        rows = ", ".join(str(i + 2) for i in frame.index[bad][:10])
+        raise ValueError(f"{table} table has invalid {column} values on rows {rows}")
+    return values.astype(int)
+
+def data_from_frames(rooms, professors, courses, panels, max_classes_per_day=5):
+    # Builds Data from four pandas DataFrames in one pass:
+    #   rooms: number, type ("room" or "lab", default "room")
+    #   professors: name, id (optional)
+    #   courses: department, name, type, lectures_per_week, labs_per_week, professors ("A; B"), number (optional)
+    #   panels: name, batches
+    # Validation is column-wise; errors list offending rows as CSV line numbers.
+    for frame, table, columns in ((rooms, "rooms", ["number"]), (professors, "professors", ["name"]),
+                                  (courses, "courses", ["department", "name", "professors"]),
+                                  (panels, "panels", ["name"])):
+        _require_columns(frame, table, columns)
+    rooms = rooms.reset_index(drop=True)
+    professors = professors.reset_index(drop=True)
+    courses = courses.reset_index(drop=True)
+    panels = panels.reset_index(drop=True)
+
+    data = Data()
+    data.max_classes_per_day = int(max_classes_per_day)
+
+    room_numbers = _text_column(rooms, "number")
+    room_types = _text_column(rooms, "type", "room").str.lower().replace("", "room")
+    if (~room_types.isin(["room", "lab"])).any():
+        raise ValueError("rooms table type must be 'room' or 'lab'")
+    for number, room_type in zip(room_numbers[room_numbers != ""], room_types[room_numbers != ""]):
+        if room_type == "lab":
+            data.add_lab_room(Room(number))
+        else:
+            data.add_room(Room(number))
+    data.generate_class_times()
+
+    names = _text_column(professors, "name")
+    names = names[names != ""]
+    if names.duplicated().any():
+        raise ValueError(f"professors table repeats names: {', '.join(names[names.duplicated()].unique()[:10])}")
+    ids = _text_column(professors, "id").reindex(names.index)
+    by_name = {}
+    for i, (name, professor_id) in enumerate(zip(names, ids)):
+        by_name[name] = Professor(professor_id or f"I{i + 1}", name)
+        data.add_professor(by_name[name])
+
+    courses = courses[_text_column(courses, "name") != ""]
+    course_types = _text_column(courses, "type", "lecture").str.lower().replace("", "lecture")
+    if (~course_types.isin(["lecture", "lab"])).any():
+        raise ValueError("courses table type must be 'lecture' or 'lab'")
+    lectures = _count_column(courses, "courses", "lectures_per_week", 3)
+    labs = _count_column(courses, "courses", "labs_per_week", (course_types == "lab").astype(int))
+    assigned = _text_column(courses, "professors").str.split(";")
+    exploded = assigned.explode().str.strip()
+    unknown = exploded[(exploded != "") & ~exploded.isin(list(by_name))]
+    if len(unknown):
+        raise ValueError(f"courses table refers to unknown professors: {', '.join(unknown.unique()[:10])}")
+
+    dept_courses = {}
+    for dept_name, number, name, course_type, names, lecture_count, lab_count in zip(
+            _text_column(courses, "department"), _text_column(courses, "number"), _text_column(courses, "name"),
+            course_types, assigned, lectures, labs):
+        courses_in_dept = dept_courses.setdefault(dept_name, [])
+        course = Course(number or f"C{len(courses_in_dept) + 1}", name, course_type,
+                        [by_name[n.strip()] for n in names if n.strip()], int(lecture_count), int(lab_count))
+        courses_in_dept.append(course)
+        data.add_course(course)
+    for dept_name, courses_in_dept in dept_courses.items():
+        data.add_dept(Department(dept_name, courses_in_dept))
+
+    panel_names = _text_column(panels, "name")
+    batches = _count_column(panels[panel_names != ""], "panels", "batches", 1, minimum=1)
+    for name, batch_count in zip(panel_names[panel_names != ""], batches):
+        data.add_panel(Panel(name, int(batch_count)))
+    return data
+
+def load_instance(path):
+    # A JSON instance file (data_from_dict layout) or a directory holding
+    # rooms, professors, courses and panels tables as .csv or .json
+    if not os.path.isdir(path):
+        with open(path) as f:
+            return data_from_dict(json.load(f))
+    tables = {}
+    for table in ("rooms", "professors", "courses", "panels"):
+        for extension in (".csv", ".json"):
+            candidate = os.path.join(path, table + extension)
+            if os.path.exists(candidate):
+                tables[table] = read_table(candidate)
+                break
+        else:
+            raise ValueError(f"{path} has no {table}.csv or {table}.json")
+    return data_from_frames(**tables)
+
+def data_to_dict(data):
+    return {
+        "max_classes_per_day": data.max_classes_per_day,
+        "rooms": [room.get_number() for room in data.get_rooms()],
+        "lab_rooms": [room.get_number() for room in data.get_lab_rooms()],
+        "professors": [{"id": p.get_id(), "name": p.get_name()} for p in data.get_professors()],
+        "departments": [{
+            "name": dept.get_name(),
+            "courses": [{
+                "number": course.get_number(),
+                "name": course.get_name(),
+                "type": "lab" if course.is_lab() else "lecture",
+                "professors": [p.get_name() for p in course.get_professors()],
+                "lectures_per_week": course.get_lectures_per_week(),
+                "labs_per_week": course.get_labs_per_week(),
+            } for course in dept.get_courses()],
+        } for dept in data.get_depts()],
+        "panels": [{"name": p.get_name(), "batches": p.get_num_batches()} for p in data.get_panels()],
+    }
+
+def schedules_to_dict(schedules, data):
+    return {
+        "panels": [{
+            "panel": panel.get_name(),
+            "fitness": schedule.get_fitness() if schedule else None,
+            "classes": schedule.get_decoded_classes() if schedule else [],
+        } for panel, schedule in zip(data.get_panels(), schedules)]
+    }
+
+def schedules_from_dict(result, data):
+    # Inverse of schedules_to_dict() for data; panels and classes that no longer fit are dropped
+    panels = {panel.get_name(): panel for panel in data.get_panels()}
+    schedules = []
+    for entry in result["panels"]:
+        panel = panels.get(entry["panel"])
+        if panel is None:
+            continue
+        schedule = Schedule(data, panel)
+        schedule.set_classes([gene for gene in encode_classes(entry["classes"], data, panel) if gene is not None])
+        schedules.append(schedule)
+    return schedules
+
+def encode_classes(classes, data, panel):
+    # Inverse of Schedule.get_decoded_classes(): maps names back to this Data's ids.
+    # Classes that no longer fit (unknown room, professor, course or time) become None.
+    depts = {dept.get_name(): i for i, dept in enumerate(data.get_depts())}
+    slots = {f"{ct.get_day()} {ct.get_time()} ({ct.get_duration()})": i for i, ct in enumerate(data.get_class_times())}
+    rooms = {room.get_number(): data.get_room_id(room) for room in data.get_rooms()}
+    lab_rooms = {room.get_number(): data.get_room_id(room) for room in data.get_lab_rooms()}
+    genes = []
+    for cls in classes:
+        gene = None
+        dept = depts.get(cls["department"])
+        batch = 0 if cls["batch"] == "All" else int(cls["batch"].split()[-1])
+        course_name = cls["course"][:-len(" (Lab)")] if batch and cls["course"].endswith(" (Lab)") else cls["course"]
+        if dept is not None and batch <= panel.get_num_batches():
+            courses = data.get_depts()[dept].get_courses()
+            course = next((i for i, c in enumerate(courses) if c.get_name() == course_name), None)
+            room = (lab_rooms if batch else rooms).get(cls["room"])
+            slot = slots.get(cls["class_time"])
+            if course is not None and room is not None and slot is not None:
+                professors = {p.get_name(): data.get_professor_id(p) for p in courses[course].get_professors()}
+                if cls["professor"] in professors:
+                    gene = Gene(dept, course, room, professors[cls["professor"]], batch, slot)
+        genes.append(gene)
+    return genes
+
+def _format_minutes(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def iter_timetable_rows(schedules, data):
+    # One EXPORT_COLUMNS row per class, generated lazily so exports hold one row at a time
+    class_times = data.get_class_times()
+    for panel, schedule in zip(data.get_panels(), schedules):
+        if not schedule:
+            continue
+        for gene in schedule.get_classes():
+            dept = data.get_depts()[gene.dept]
+            course = dept.get_courses()[gene.course]
+            class_time = class_times[gene.class_time]
+            yield [
+                panel.get_name(),
+                f"Batch {gene.batch}" if gene.batch else "All",
+                dept.get_name(),
+                f"{course.get_name()} (Lab)" if gene.batch else course.get_name(),
+                data.get_room_number(gene.room),
+                data.get_professor_name(gene.professor),
+                class_time.get_day(),
+                _format_minutes(class_time.get_start_minutes()),
+                _format_minutes(class_time.get_end_minutes()),
+            ]
+
+def schedules_to_frame(schedules, data):
+    # Same rows as iter_timetable_rows() as a DataFrame. Genes are stacked into one
+    # integer array and names are looked up once per distinct id, not once per class.
+    import pandas as pd
+
+    genes = np.array([(i, gene.dept, gene.course, gene.room, gene.professor, gene.batch, gene.class_time)
+                      for i, schedule in enumerate(schedules) if schedule for gene in schedule.get_classes()],
+                     dtype=np.int64).reshape(-1, 7)
+    panel, dept, course, room, professor, batch, slot = genes.T
+    depts = data.get_depts()
+    width = max((len(d.get_courses()) for d in depts), default=1)
+
+    def names(ids, lookup):
+        unique, inverse = np.unique(ids, return_inverse=True)
+        return np.array([lookup(int(value)) for value in unique], dtype=object)[inverse]
+
+    courses = names(dept * width + course, lambda key: depts[key // width].get_courses()[key % width].get_name())
+    return pd.DataFrame({
+        "Panel": names(panel, lambda i: data.get_panels()[i].get_name()),
+        "Batch": names(batch, lambda b: f"Batch {b}" if b else "All"),
+        "Department": names(dept, lambda d: depts[d].get_name()),
+        "Course": np.where(batch > 0, courses + " (Lab)", courses),
+        "Room": names(room, data.get_room_number),
+        "Professor": names(professor, data.get_professor_name),
+        "Day": np.array(DAYS_OF_WEEK, dtype=object)[np.array(data.get_slot_days(), dtype=np.int64)[slot]],
+        "Start": names(data.get_slot_starts()[slot], _format_minutes),
+        "End": names(data.get_slot_ends()[slot], _format_minutes),
+    }, columns=EXPORT_COLUMNS)
+
+def timetable_grid(frame, view, name):
+    # Time x day grid of the classes of one panel, room or professor (view is the column
+    # name); each cell lists the other resources of its classes, one class per line
+    rows = frame[frame[view] == name]
+    others = [column for column in ("Panel", "Course", "Room", "Professor") if column != view]
+    labels = rows[others[0]].str.cat([rows[column] for column in others[1:]], sep=" · ")
+    labels = labels.where(rows["Batch"] == "All", labels + " · " + rows["Batch"])
+    grid = rows.assign(Label=labels, Time=rows["Start"] + "–" + rows["End"]).pivot_table(
+        index="Time", columns="Day", values="Label", aggfunc="\n".join)
+    return grid.reindex(columns=DAYS_OF_WEEK).fillna("").rename_axis(index=None, columns=None)
+
+def export_csv(schedules, data, f):
+    writer = csv.writer(f)
+    writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(iter_timetable_rows(schedules, data))
+
+def export_excel(schedules, data, target):
+    # Write-only workbooks stream rows to a temporary file instead of keeping cells in memory
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Timetable")
+    sheet.append(EXPORT_COLUMNS)
+    for row in iter_timetable_rows(schedules, data):
+        sheet.append(row)
+    workbook.save(target)
+
+def _ical_text(value):
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _write_ical_line(f, line):
+    # Content lines are folded at 75 octets without splitting a UTF-8 sequence
+    # (continuation lines count their leading space)
+    encoded = line.encode("utf-8")
+    limit = 75
+    while len(encoded) > limit:
+        cut = limit
+        while encoded[cut] & 0xC0 == 0x80:
+            cut -= 1
+        f.write(encoded[:cut].decode("utf-8") + "\r\n ")
+        encoded = encoded[cut:]
+        limit = 74
+    f.write(encoded.decode("utf-8") + "\r\n")
+
+def export_ical(schedules, data, f, week_start=None):
+    # One weekly recurring event per class, starting in the week of week_start
+    # (default: this week). Times are floating, i.e. local to whoever imports them.
+    week_start = week_start or date.today()
+    week_start -= timedelta(days=week_start.weekday())
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    _write_ical_line(f, "BEGIN:VCALENDAR")
+    _write_ical_line(f, "VERSION:2.0")
+    _write_ical_line(f, "PRODID:-//Time Table Generator//EN")
+    for i, (panel, batch, dept, course, room, professor, day, start, end) in \
+            enumerate(iter_timetable_rows(schedules, data)):
+        day_date = (week_start + timedelta(days=DAYS_OF_WEEK.index(day))).strftime("%Y%m%d")
+        summary = course if batch == "All" else f"{course} ({batch})"
+        for line in ("BEGIN:VEVENT",
+                     f"UID:{i}-{_digest([panel, batch, course, day, start])[:16]}@timetable-generator",
+                     f"DTSTAMP:{stamp}",
+                     f"DTSTART:{day_date}T{start.replace(':', '')}00",
+                     f"DTEND:{day_date}T{end.replace(':', '')}00",
+                     "RRULE:FREQ=WEEKLY",
+                     f"SUMMARY:{_ical_text(summary)}",
+                     f"LOCATION:{_ical_text(room)}",
+                     f"DESCRIPTION:{_ical_text(f'{panel}, {dept}, {professor}')}",
+                     f"CATEGORIES:{_ical_text(panel)}",
+                     "END:VEVENT"):
+            _write_ical_line(f, line)
+    _write_ical_line(f, "END:VCALENDAR")
+
+def export_timetable(schedules, data, target, extension=None):
+    # Streams the timetable to a path or binary file; the format follows the extension
+    # of target, or extension for file objects (one of EXPORT_FORMATS)
+    extension = (extension or os.path.splitext(target)[1]).lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {extension!r}, use one of {', '.join(EXPORT_FORMATS)}.")
+    if extension == ".xlsx":
+        export_excel(schedules, data, target)
+        return
+    export = export_csv if extension == ".csv" else export_ical
+    if isinstance(target, str):
+        with open(target, "w", encoding="utf-8", newline="") as f:
+            export(schedules, data, f)
+    else:
+        f = io.TextIOWrapper(target, encoding="utf-8", newline="")
+        export(schedules, data, f)
+        f.flush()
+        f.detach()
+
+def export_bytes(schedules, data, extension):
+    buffer = io.BytesIO()
+    export_timetable(schedules, data, buffer, extension)
+    return buffer.getvalue()
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+def instance_key(data, config):
+    # Room and professor order carry no meaning, so they are sorted; department,
+    # course and panel order define the gene layout and are kept.
+    instance = data_to_dict(data)
+    instance["rooms"] = sorted(instance["rooms"])
+    instance["lab_rooms"] = sorted(instance["lab_rooms"])
+    instance["professors"] = sorted(p["name"] for p in instance["professors"])
+    for dept in instance["departments"]:
+        for course in dept["courses"]:
+            course["professors"] = sorted(course["professors"])
+    return _digest({"instance": instance, "solver": config.to_dict()})
+
+def layout_key(data):
+    # Instances with the same layout key produce genes in the same positions
+    return _digest({
+        "departments": [[dept.get_name(), [[c.get_name(), c.is_lab(), c.get_lectures_per_week(), c.get_labs_per_week()]
+                                           for c in dept.get_courses()]] for dept in data.get_depts()],
+        "panels": [[p.get_name(), p.get_num_batches()] for p in data.get_panels()],
+    })
+
+class ResultCache:
+    # Best timetables on local disk, one JSON file per instance named
+    # "<layout key>-<instance key>.json". Only conflict-free entries are answered from
+    # the cache; a timetable that still clashes is kept (unless a better one is) as a warm
+    # start for the next solve. File mtimes track recency; the least recently used files
+    # are evicted once the directory exceeds max_bytes.
+    def __init__(self, directory=RESULT_CACHE_DIR, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, data, config):
+        path = self._path(data, instance_key(data, config))
+        entry = self._load(path)
+        if entry is None or entry.get("fitness") != 1.0:
+            return None
+        schedules = []
+        for panel in data.get_panels():
+            if panel.get_name() not in entry["panels"]:
+                return None
+            genes = encode_classes(entry["panels"][panel.get_name()], data, panel)
+            if any(gene is None for gene in genes):
+                return None
+            schedule = Schedule(data, panel)
+            schedule.set_classes(genes)
+            schedules.append(schedule)
+        os.utime(path)
+        return schedules
+
+    def get_warm_start(self, data):
+        # Cached timetable of the most recently used instance with the same layout,
+        # with genes that no longer fit replaced by freshly initialized ones
+        prefix = layout_key(data)[:16] + "-"
+        paths = [os.path.join(self._directory, name) for name in os.listdir(self._directory)
+                 if name.startswith(prefix) and name.endswith(".json")]
+        for path in sorted(paths, key=os.path.getmtime, reverse=True):
+            entry = self._load(path)
+            if entry is None:
+                continue
+            schedules = []
+            for panel in data.get_panels():
+                schedule = Schedule(data, panel).initialize()
+                genes = encode_classes(entry["panels"].get(panel.get_name(), []), data, panel)
+                for i, gene in enumerate(genes[:len(schedule.get_classes())]):
+                    if gene is not None:
+                        schedule.set_class(i, gene)
+                schedules.append(schedule)
+            os.utime(path)
+            return schedules
+        return None
+
+    def put(self, data, config, schedules):
+        path = self._path(data, instance_key(data, config))
+        fitness = timetable_fitness(schedules)
+        previous = self._load(path)
+        if previous is not None and previous.get("fitness", 0) >= fitness:
+            os.utime(path)
+            return
+        entry = {
+            "fitness": fitness,
+            "panels": {panel.get_name(): schedule.get_decoded_classes()
+                       for panel, schedule in zip(data.get_panels(), schedules) if schedule is not None},
+        }
+        temporary = path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump(entry, f)
+        os.replace(temporary, path)
+        self._evict()
+
+    def clear(self):
+        for name in os.listdir(self._directory):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self._directory, name))
+
+    def _path(self, data, key):
+        return os.path.join(self._directory, f"{layout_key(data)[:16]}-{key}.json")
+
+    def _load(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self._directory):
+            if name.endswith(".json"):
+                path = os.path.join(self._directory, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
 class PrettyTableDisplay:
     def print_schedule_as_table(self, schedule):
+        import prettytable
+        import streamlit as st
+
         table = prettytable.PrettyTable(['Panel', 'Batch', 'Department', 'Course', 'Room', 'Professor', 'Class Time'])
-        for cls in schedule.get_classes():
+        for cls in schedule.get_decoded_classes():
             table.add_row([
                 cls["panel"],
                 cls["batch"],
@@ -397,9 +2682,52 @@ class PrettyTableDisplay:
             ])
         st.text(table)
 
-def main():
-    st.title('University Timetable Scheduling')
-    st.header('Input Data')
+class GridDisplay:
+    # Time x day grids as native Streamlit dataframes, for one panel, room or professor at a time
+    def show_timetable(self, frame):
+        import streamlit as st
+
+        if frame.empty:
+            st.write("No classes scheduled.")
+            return
+        view = st.radio('View timetable by:', ["Panel", "Room", "Professor"], horizontal=True, key='timetable_view')
+        names = frame[view].unique()
+        name = st.selectbox(f'{view}:', names if view == "Panel" else sorted(names), key=f'timetable_{view.lower()}')
+        st.dataframe(timetable_grid(frame, view, name), width='stretch')
+
+def input_data_from_uploads():
+    import streamlit as st
+
+    with st.expander('Bulk import from CSV or JSON files'):
+        st.caption('rooms: number, type (room/lab) · professors: name · '
+                   'courses: department, name, type, lectures_per_week, labs_per_week, professors (separated by ";") · '
+                   'panels: name, batches')
+        uploads = {
+            table: st.file_uploader(f'{table.capitalize()} file', type=['csv', 'json'], key=f'upload_{table}')
+            for table in ('rooms', 'professors', 'courses', 'panels')
+        }
+        max_classes_per_day = st.number_input(
+            'Maximum Classes Per Day (Per Professor):',
+            min_value=1,
+            max_value=10,
+            value=5,
+            key='bulk_max_classes_per_day'
+        )
+    if not all(uploads.values()):
+        return None
+    try:
+        data = data_from_frames(max_classes_per_day=max_classes_per_day,
+                                **{table: read_table(upload) for table, upload in uploads.items()})
+    except ValueError as error:
+        st.error(f"Could not import files: {error}")
+        return None
+    st.success(f"Imported {len(data.get_rooms()) + len(data.get_lab_rooms())} rooms, "
+               f"{len(data.get_professors())} professors, {len(data.get_courses())} courses "
+               f"and {len(data.get_panels())} panels.")
+    return data
+
+def input_data_from_widgets():
+    import streamlit as st
 
     data = Data()
 
@@ -489,6 +2817,48 @@ def main():
             )
             data.add_panel(Panel(panel_name, num_batches))
 
+    return data
+
+def main():
+    import streamlit as st
+
+    st.title('University Timetable Scheduling')
+    st.header('Input Data')
+
+    data = input_data_from_uploads()
+    if data is None:
+        data = input_data_from_widgets()
+
+    # Solver settings
+    solver = st.selectbox(
+        'Solver:',
+        SOLVERS,
+        format_func=lambda name: {"ga": "Genetic algorithm", "memetic": "Genetic algorithm + tabu search",
+                                  "multipanel": "Multi-panel (shared resources)",
+                                  "exact": "Exact (graph colouring)"}[name],
+        key='solver'
+    )
+    island_workers = st.number_input(
+        'Island Workers (processes, 1 = single-core GA):',
+        min_value=1,
+        max_value=os.cpu_count() or 1,
+        value=ISLAND_WORKERS,
+        key='island_workers'
+    )
+    migration_interval = st.number_input(
+        'Migration Interval (generations):',
+        min_value=1,
+        max_value=GENERATIONS,
+        value=MIGRATION_INTERVAL,
+        key='migration_interval'
+    )
+    time_limit = st.number_input(
+        'Time Limit (seconds, 0 = none):',
+        min_value=0,
+        value=TIME_LIMIT or 0,
+        key='time_limit'
+    )
+
     if st.button('Generate Timetable'):
         if not data.get_rooms():
             st.error("Please add at least one room.")
@@ -503,27 +2873,71 @@ def main():
             st.error("Please add at least one panel.")
             return
 
-        with st.spinner('Generating timetable... This may take a while...'):
-            population = Population(POPULATION_SIZE, data)
-            genetic_algorithm = GeneticAlgorithm()
-            for generation in range(GENERATIONS):
-                population = genetic_algorithm.evolve(population)
-                if generation % 100 == 0:
-                    st.write(f'Generation {generation}')
-                best_schedule = max(population.get_schedules(), key=lambda s: s.get_fitness())
-                if best_schedule.get_fitness() == 1.0:
-                    break
-
+        # The job keeps its own Data, so later edits to the inputs don't affect it
+        previous_job = st.session_state.get('solve_job')
+        if previous_job is not None and previous_job.is_running():
+            previous_job.cancel()
+        config = SolverConfig(workers=island_workers, migration_interval=migration_interval, solver=solver,
+                              time_limit=time_limit or None)
+        st.session_state['solve_job'] = SolveJob(data, config, ResultCache()).start()
+
+    # After an input change, re-fit the last timetable instead of solving from scratch
+    finished_job = st.session_state.get('solve_job')
+    if finished_job is not None and not finished_job.is_running() and finished_job.get_result() and \
+            data.get_panels() and st.button('Repair Previous Timetable'):
+        changes = {key: value for key, value in diff_data(finished_job.get_data(), data).items() if value}
+        st.write("Changes since the previous timetable:", changes or "none")
+        st.session_state['solve_job'] = SolveJob(data, previous=finished_job.get_result()).start()
+
+    if st.session_state.get('solve_job') is not None:
+        show_solve_job()
+
+def show_solve_job():
+    import streamlit as st
+
+    job = st.session_state['solve_job']
+    if job.is_running():
+        # Polls only while the job runs; the first poll after it ends reruns the whole
+        # page, which then renders the finished job once
+        @st.fragment(run_every=1)
+        def solve_job_progress():
+            if not job.is_running():
+                st.rerun()
+            progress = job.get_progress()
+            st.info(f"Generating timetable... generation {progress['generation']}, "
+                    f"best fitness {progress['best_fitness']:.4f}, "
+                    f"{progress['generations_per_second']:.1f} generations/s")
+            if st.button('Cancel', key='cancel_solve'):
+                job.cancel()
+
+        solve_job_progress()
+        return
+
+    # A fragment, so picking another view or download reruns only the timetable
+    @st.fragment
+    def solve_job_result():
+        progress = job.get_progress()
+        if job.get_error() is not None:
+            st.error(f"Timetable generation failed: {job.get_error()}")
+            return
+        if job.is_cancelled():
+            st.warning(f"Cancelled after {progress['generation']} generations; showing the best timetable found.")
         st.header("Generated Timetable")
-        display = PrettyTableDisplay()
-        for panel in data.get_panels():
-            st.subheader(f"Panel: {panel.get_name()}")
-            panel_schedules = [s for s in population.get_schedules() if s._panel == panel]
-            if panel_schedules:
-                best_panel_schedule = max(panel_schedules, key=lambda s: s.get_fitness())
-                display.print_schedule_as_table(best_panel_schedule)
-            else:
+        data, schedules = job.get_data(), job.get_result()
+        for panel, best_panel_schedule in zip(data.get_panels(), schedules):
+            if not best_panel_schedule:
                 st.write(f"No schedule generated for panel {panel.get_name()}.")
+        # Widget changes rerun this fragment, so the frame is built once per job
+        cached = st.session_state.get('timetable_frame')
+        if cached is None or cached[0] is not job:
+            cached = st.session_state['timetable_frame'] = (job, schedules_to_frame(schedules, data))
+        GridDisplay().show_timetable(cached[1])
+        for extension, label in ((".csv", "CSV"), (".xlsx", "Excel"), (".ics", "iCalendar")):
+            st.download_button(f'Download {label}', lambda extension=extension: export_bytes(schedules, data, extension),
+                               file_name=f'timetable{extension}', mime=EXPORT_FORMATS[extension],
+                               on_click='ignore', key=f'download{extension}')
+
+    solve_job_result()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,181 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import Time_table as tt
+
+# Instance shapes for the synthetic generator. Every panel attends every course,
+# so courses stay few and the instances grow in panels, rooms and professors
+# (enough of them that a clash-free timetable exists).
+SIZES = {
+    "small": {"rooms": 4, "lab_rooms": 4, "professors": 8, "professors_per_course": (2, 4), "departments": 2,
+              "courses_per_department": 3, "panels": 2, "batches": 2},
+    "medium": {"rooms": 12, "lab_rooms": 12, "professors": 40, "professors_per_course": (4, 6), "departments": 3,
+               "courses_per_department": 3, "panels": 8, "batches": 3},
+    "large": {"rooms": 40, "lab_rooms": 40, "professors": 200, "professors_per_course": (12, 16), "departments": 4,
+              "courses_per_department": 3, "panels": 30, "batches": 4},
+    # Few rooms and professors for many courses: the constructive start leaves clashes to repair
+    "tight": {"rooms": 2, "lab_rooms": 3, "professors": 10, "professors_per_course": (1, 2), "departments": 4,
+              "courses_per_department": 6, "panels": 4, "batches": 3},
+}
+
+
+def generate_instance(size, seed=0):
+    # Seeded synthetic instance in the data_from_dict layout
+    shape = SIZES[size]
+    rng = random.Random(seed)
+    professors = [f"Professor {i + 1}" for i in range(shape["professors"])]
+    departments = []
+    for d in range(shape["departments"]):
+        courses = []
+        for c in range(shape["courses_per_department"]):
+            course_type = "lab" if c % 3 == 2 else "lecture"
+            courses.append({
+                "number": f"C{c + 1}",
+                "name": f"D{d + 1} Course {c + 1}",
+                "type": course_type,
+                "professors": rng.sample(professors, min(len(professors), rng.randint(*shape["professors_per_course"]))),
+                "lectures_per_week": rng.randint(1, 2),
+                "labs_per_week": 1 if course_type == "lab" else 0,
+            })
+        departments.append({"name": f"Department {d + 1}", "courses": courses})
+    return {
+        "max_classes_per_day": 5,
+        "rooms": [f"R{i + 1}" for i in range(shape["rooms"])],
+        "lab_rooms": [f"L{i + 1}" for i in range(shape["lab_rooms"])],
+        "professors": professors,
+        "departments": departments,
+        "panels": [{"name": f"Panel {i + 1}", "batches": shape["batches"]} for i in range(shape["panels"])],
+    }
+
+
+def generate_data(size, seed=0):
+    return tt.data_from_dict(generate_instance(size, seed))
+
+
+def bench_initialize(data, repeat):
+    panels = data.get_panels()
+    start = time.perf_counter()
+    for i in range(repeat):
+        tt.Schedule(data, panels[i % len(panels)]).initialize()
+    elapsed = time.perf_counter() - start
+    return {"calls": repeat, "seconds_per_call": elapsed / repeat}
+
+
+def bench_calculate_fitness(data, repeat):
+    schedules = [tt.Schedule(data, panel).initialize() for panel in data.get_panels()]
+    start = time.perf_counter()
+    for i in range(repeat):
+        schedules[i % len(schedules)].calculate_fitness()
+    elapsed = time.perf_counter() - start
+    population = tt.Population(0, data)
+    panels = data.get_panels()
+    population.get_schedules().extend(tt.Schedule(data, panels[i % len(panels)]).initialize() for i in range(repeat))
+    batch_start = time.perf_counter()
+    tt.evaluate_population(population)
+    batch_elapsed = time.perf_counter() - batch_start
+    return {
+        "evaluations": repeat,
+        "evaluations_per_second": repeat / elapsed,
+        "batch_evaluations": len(population.get_schedules()),
+        "batch_evaluations_per_second": len(population.get_schedules()) / batch_elapsed,
+    }
+
+
+def bench_evolve(data, config):
+    tt.rd.seed(config.seed)
+    generations_run = 0
+    reached = None
+
+    def on_progress(generation, best_fitness):
+        nonlocal generations_run, reached
+        generations_run = generation + 1
+        if best_fitness == 1.0 and reached is None:
+            reached = generation + 1
+
+    start = time.perf_counter()
+    try:
+        schedules = tt.solve(data, config, on_progress)
+    except tt.InfeasibleInstanceError as error:
+        return {"solver": config.solver, "seconds": time.perf_counter() - start, "infeasible": str(error)}
+    elapsed = time.perf_counter() - start
+    generations_run = max(generations_run, 1)
+    result = {"solver": config.solver, "seconds": elapsed}
+    # The exact solver has no generations, and a multipanel round evolves a varying number
+    # of generations per panel, so only the GA solvers evaluate population_size x panels each
+    if config.solver != "exact":
+        result.update({
+            "generations": generations_run,
+            "seconds_per_generation": elapsed / generations_run,
+            "generations_to_fitness_1": reached,
+        })
+    if config.solver in ("ga", "memetic"):
+        result["evaluations_per_second"] = generations_run * config.population_size * len(data.get_panels()) / elapsed
+    result.update({
+        "seconds_to_fitness_1": elapsed if reached is not None else None,
+        "best_fitness": tt.timetable_fitness(schedules),
+    })
+    return result
+
+
+def measure_peak_memory(function, *args):
+    # Run separately from the timed benchmarks, tracemalloc slows allocation down
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes, seed, generations, population_size, repeat, solvers=("ga",)):
+    results = []
+    for size in sizes:
+        data = generate_data(size, seed)
+        memory_config = tt.SolverConfig(population_size=population_size, generations=min(generations, 10), seed=seed)
+        common = {"size": size, "seed": seed, "panels": len(data.get_panels()),
+                  "genes_per_schedule": len(tt.Schedule(data, data.get_panels()[0]).initialize().get_classes())}
+        results.append(dict(common, benchmark="initialize", **bench_initialize(data, repeat)))
+        results.append(dict(common, benchmark="calculate_fitness", **bench_calculate_fitness(data, repeat)))
+        for solver in solvers:
+            config = tt.SolverConfig(population_size=population_size, generations=generations, seed=seed, solver=solver)
+            evolve = bench_evolve(data, config)
+            if solver == "ga":
+                evolve["peak_memory_bytes"] = measure_peak_memory(tt.solve, data, memory_config)
+            results.append(dict(common, benchmark="evolve", population_size=population_size, **evolve))
+    return {
+        "format": 1,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the timetable GA on synthetic instances.')
+    parser.add_argument('--sizes', nargs='+', choices=sorted(SIZES), default=['small', 'medium', 'tight'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--generations', type=int, default=200)
+    parser.add_argument('--population-size', type=int, default=tt.POPULATION_SIZE)
+    parser.add_argument('--repeat', type=int, default=200, help='calls per micro-benchmark')
+    parser.add_argument('--solvers', nargs='+', choices=tt.SOLVERS, default=['ga', 'memetic', 'exact'],
+                        help='compare these solvers on time to a conflict-free timetable')
+    parser.add_argument('-o', '--output', help='write the JSON report here (default: stdout)')
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.seed, args.generations, args.population_size, args.repeat, args.solvers)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
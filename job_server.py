@@ -0,0 +1,406 @@
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from Time_table import (InfeasibleInstanceError, ResultCache, SolverConfig, data_from_dict, instance_key,
+                        schedules_to_dict, solve)
+
+HOST = "127.0.0.1"
+PORT = 8765
+JOB_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+FINISHED_JOBS = 256  # finished jobs kept for late watchers and duplicate requests
+PROGRESS_INTERVAL = 0.5  # seconds between progress messages of one job
+LINE_LIMIT = 64 * 1024 * 1024  # longest request line, instances arrive as one JSON line
+FINAL_STATES = ("done", "failed", "cancelled")
+
+# The server speaks newline-delimited JSON over TCP. Requests:
+#   {"op": "submit", "instance": {...}, "config": {...}, "priority": 0, "watch": true}
+#   {"op": "watch", "job": key}    {"op": "cancel", "job": key}    {"op": "status"}
+# Every reply carries an "event": "accepted", "progress", "done", "failed",
+# "cancelled", "status" or "error". Jobs are named by instance_key(), so identical
+# requests share one job; higher priorities are dispatched first.
+
+
+def _run_job(key, instance, config, progress, cancel, cache_dir):
+    # Runs in a pool process; progress and cancel are multiprocessing manager proxies,
+    # and the last progress is returned with the result, as throttling may have held it back
+    data = data_from_dict(instance)
+    last_report = 0
+    last_progress = (0, 0)
+
+    def on_progress(generation, best_fitness):
+        nonlocal last_report, last_progress
+        last_progress = (generation, best_fitness)
+        now = time.monotonic()
+        if now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            progress.put((key, generation, best_fitness))
+
+    cache = ResultCache(cache_dir) if cache_dir else None
+    schedules = solve(data, SolverConfig.from_dict(config), on_progress, cancel, cache)
+    return schedules_to_dict(schedules, data), last_progress
+
+
+def _load_request(instance, config):
+    # (instance key, settings dict) of a submission
+    data = data_from_dict(instance)
+    config = SolverConfig.from_dict(config or {})
+    config.workers = 1
+    return instance_key(data, config), config.to_dict()
+
+
+class Job:
+    def __init__(self, key, instance, config, priority, cancel):
+        self._key = key
+        self._instance = instance
+        self._config = config
+        self._priority = priority
+        self._cancel = cancel
+        self._state = "queued"
+        self._generation = 0
+        self._best_fitness = 0
+        self._result = None
+        self._error = None
+        self._submitted_at = time.monotonic()
+        self._watchers = []
+
+    def get_key(self):
+        return self._key
+
+    def get_instance(self):
+        return self._instance
+
+    def get_config(self):
+        return self._config
+
+    def get_priority(self):
+        return self._priority
+
+    def set_priority(self, priority):
+        self._priority = priority
+
+    def get_cancel(self):
+        return self._cancel
+
+    def get_state(self):
+        return self._state
+
+    def is_finished(self):
+        return self._state in FINAL_STATES
+
+    def start(self):
+        self._state = "running"
+
+    def update_progress(self, generation, best_fitness):
+        self._generation = generation
+        self._best_fitness = best_fitness
+        self._publish(self._progress_event())
+
+    def finish(self, state, result=None, error=None):
+        self._state = state
+        self._result = result
+        self._error = error
+        self._publish(self.get_final_event())
+        self._watchers = []
+
+    def get_status(self):
+        return {"job": self._key, "state": self._state, "priority": self._priority, "generation": self._generation,
+                "best_fitness": self._best_fitness, "age": time.monotonic() - self._submitted_at}
+
+    def get_final_event(self):
+        event = {"event": self._state, "job": self._key}
+        if self._result is not None:
+            event["result"] = self._result
+        if self._error is not None:
+            event.update(self._error)
+        return event
+
+    def watch(self):
+        # Queue of this job's events, ending with its final event
+        watcher = asyncio.Queue()
+        if self.is_finished():
+            watcher.put_nowait(self.get_final_event())
+        else:
+            watcher.put_nowait(self._progress_event())
+            self._watchers.append(watcher)
+        return watcher
+
+    def _progress_event(self):
+        return {"event": "progress", "job": self._key, "state": self._state, "generation": self._generation,
+                "best_fitness": self._best_fitness}
+
+    def _publish(self, event):
+        for watcher in self._watchers:
+            watcher.put_nowait(event)
+
+
+class JobServer:
+    # Queues solve requests by priority and runs at most `workers` of them at a time
+    # in a process pool. Island workers would nest pools inside pool processes, so
+    # every job runs single-process; the pool size is the only parallelism knob.
+    def __init__(self, workers=JOB_WORKERS, cache_dir=None, finished_jobs=FINISHED_JOBS):
+        self._workers = workers
+        self._cache_dir = cache_dir
+        self._finished_jobs = finished_jobs
+        self._jobs = OrderedDict()
+        self._queue = []  # heap of (-priority, sequence, key); stale entries are skipped
+        self._sequence = itertools.count()
+        self._queued = None
+        self._manager = None
+        self._pool = None
+
+    def get_jobs(self):
+        return list(self._jobs.values())
+
+    async def serve(self, host=HOST, port=PORT, on_ready=None):
+        loop = asyncio.get_running_loop()
+        self._queued = asyncio.Condition()
+        self._manager = multiprocessing.Manager()
+        self._pool = ProcessPoolExecutor(max_workers=self._workers)
+        progress = self._manager.Queue()
+        tasks = [asyncio.create_task(self._dispatch(progress)) for _ in range(self._workers)]
+        tasks.append(asyncio.create_task(self._forward_progress(progress)))
+        server = await asyncio.start_server(self._handle_client, host, port, limit=LINE_LIMIT)
+        try:
+            if on_ready:
+                on_ready(server.sockets[0].getsockname())
+            async with server:
+                await server.serve_forever()
+        finally:
+            for job in self._jobs.values():
+                if not job.is_finished():
+                    job.get_cancel().set()
+            for task in tasks:
+                task.cancel()
+            progress.put(None)
+            await loop.run_in_executor(None, self._pool.shutdown)
+            self._manager.shutdown()
+
+    async def submit(self, instance, config=None, priority=0):
+        # Returns (job, duplicate). Raises ValueError for instances or settings that don't load.
+        # Parsing and hashing a large instance takes a while, so it runs off the event loop.
+        key, config = await asyncio.get_running_loop().run_in_executor(None, _load_request, instance, config)
+        job = self._jobs.get(key)
+        if job is not None and job.get_state() in ("queued", "running", "done"):
+            self._jobs.move_to_end(key)
+            if job.get_state() == "queued" and priority > job.get_priority():
+                job.set_priority(priority)
+                await self._enqueue(job)
+            return job, True
+        job = Job(key, instance, config, priority, self._manager.Event())
+        self._jobs[key] = job
+        self._jobs.move_to_end(key)
+        await self._enqueue(job)
+        return job, False
+
+    def cancel(self, key):
+        # A queued job is dropped at once, a running one stops with its best timetable so far
+        job = self._jobs.get(key)
+        if job is None or job.is_finished():
+            return job
+        job.get_cancel().set()
+        if job.get_state() == "queued":
+            job.finish("cancelled")
+            self._forget_finished()
+        return job
+
+    async def _enqueue(self, job):
+        async with self._queued:
+            heapq.heappush(self._queue, (-job.get_priority(), next(self._sequence), job.get_key()))
+            self._queued.notify()
+
+    async def _next_job(self):
+        async with self._queued:
+            while True:
+                while self._queue:
+                    priority, _, key = heapq.heappop(self._queue)
+                    job = self._jobs.get(key)
+                    if job is not None and job.get_state() == "queued" and -priority == job.get_priority():
+                        return job
+                await self._queued.wait()
+
+    async def _dispatch(self, progress):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._next_job()
+            job.start()
+            try:
+                result, last_progress = await loop.run_in_executor(
+                    self._pool, _run_job, job.get_key(), job.get_instance(), job.get_config(), progress,
+                    job.get_cancel(), self._cache_dir)
+            except InfeasibleInstanceError as error:
+                job.finish("failed", error={"error": str(error), "infeasible": True})
+            except Exception as error:
+                job.finish("failed", error={"error": f"{type(error).__name__}: {error}"})
+            else:
+                job.update_progress(*last_progress)
+                job.finish("cancelled" if job.get_cancel().is_set() else "done", result)
+            self._forget_finished()
+
+    async def _forward_progress(self, progress):
+        # Pool processes report through a manager queue; a thread blocks on it for us
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await loop.run_in_executor(None, progress.get)
+            if message is None:
+                return
+            job = self._jobs.get(message[0])
+            if job is not None and job.get_state() == "running":
+                job.update_progress(message[1], message[2])
+
+    def _forget_finished(self):
+        finished = [key for key, job in self._jobs.items() if job.is_finished()]
+        for key in finished[:max(0, len(finished) - self._finished_jobs)]:
+            del self._jobs[key]
+
+    async def _handle_client(self, reader, writer):
+        watches = []
+
+        async def send(event):
+            writer.write(json.dumps(event).encode() + b"\n")
+            await writer.drain()
+
+        async def stream(job):
+            watcher = job.watch()
+            try:
+                while True:
+                    event = await watcher.get()
+                    await send(event)
+                    if event["event"] in FINAL_STATES:
+                        return
+            except ConnectionError:
+                pass
+
+        try:
+            while line := await reader.readline():
+                try:
+                    request = await asyncio.get_running_loop().run_in_executor(None, json.loads, line)
+                    op = request.get("op")
+                    if op == "submit":
+                        job, duplicate = await self.submit(request["instance"], request.get("config"),
+                                                           int(request.get("priority", 0)))
+                        await send({"event": "accepted", "job": job.get_key(), "state": job.get_state(),
+                                    "duplicate": duplicate})
+                        if request.get("watch", True):
+                            watches.append(asyncio.create_task(stream(job)))
+                    elif op in ("watch", "cancel"):
+                        job = self._jobs.get(request.get("job"))
+                        if job is None:
+                            await send({"event": "error", "error": f"Unknown job {request.get('job')!r}"})
+                        elif op == "watch":
+                            watches.append(asyncio.create_task(stream(job)))
+                        else:
+                            self.cancel(job.get_key())
+                            await send({"event": "status", "jobs": [job.get_status()]})
+                    elif op == "status":
+                        await send({"event": "status", "jobs": [job.get_status() for job in self._jobs.values()]})
+                    else:
+                        await send({"event": "error", "error": f"Unknown op {op!r}"})
+                except (ValueError, KeyError, TypeError, AttributeError) as error:
+                    await send({"event": "error", "error": f"Bad request: {error}"})
+            await asyncio.gather(*watches)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            for task in watches:
+                task.cancel()
+            writer.close()
+
+
+async def request(host, port, message, on_event):
+    # Client side: sends one request and passes replies to on_event until it returns True
+    reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+    try:
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+        while line := await reader.readline():
+            if on_event(json.loads(line)):
+                return
+    finally:
+        writer.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Serve timetable solve requests from a bounded process pool, '
+                                                 'or send requests to a running server.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help='run the job server')
+    serve.add_argument('--workers', type=int, default=JOB_WORKERS, help='jobs solved at the same time')
+    serve.add_argument('--cache-dir', help='reuse and store results in this directory')
+    submit = commands.add_parser('submit', help='submit a JSON instance and wait for its timetable')
+    submit.add_argument('instance', help='JSON instance file, as for timetable_cli.py')
+    submit.add_argument('--config', help='JSON object of solver settings, e.g. \'{"solver": "memetic"}\'')
+    submit.add_argument('--priority', type=int, default=0, help='higher priorities are solved first')
+    submit.add_argument('-o', '--output', help='where to write the timetable JSON (default: stdout)')
+    submit.add_argument('-q', '--quiet', action='store_true', help='do not report progress on stderr')
+    cancel = commands.add_parser('cancel', help='cancel a job')
+    cancel.add_argument('job')
+    commands.add_parser('status', help='list queued, running and recently finished jobs')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'serve':
+        server = JobServer(args.workers, args.cache_dir)
+        try:
+            asyncio.run(server.serve(args.host, args.port, lambda address: print(
+                f'Serving on {address[0]}:{address[1]} with {args.workers} workers', file=sys.stderr)))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.command == 'submit':
+        with open(args.instance) as f:
+            message = {"op": "submit", "instance": json.load(f), "config": json.loads(args.config or "{}"),
+                       "priority": args.priority}
+    elif args.command == 'cancel':
+        message = {"op": "cancel", "job": args.job}
+    else:
+        message = {"op": "status"}
+    final = {}
+
+    def on_event(event):
+        if event["event"] == "progress":
+            if not args.quiet:
+                print(f'Generation {event["generation"]}: best fitness {event["best_fitness"]:.4f}', file=sys.stderr)
+            return False
+        if event["event"] == "accepted":
+            if not args.quiet:
+                print(f'Job {event["job"]} {event["state"]}' + (' (duplicate)' if event["duplicate"] else ''),
+                      file=sys.stderr)
+            return False
+        final.update(event)
+        return True
+
+    asyncio.run(request(args.host, args.port, message, on_event))
+    if final.get("event") == "status":
+        json.dump(final["jobs"], sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    elif final.get("event") in ("error", "failed"):
+        sys.exit(f'{final["event"].title()}: {final.get("error")}')
+    elif "result" in final:
+        if final["event"] == "cancelled":
+            print('Cancelled; returning the best timetable found.', file=sys.stderr)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(final["result"], f, indent=2)
+        else:
+            json.dump(final["result"], sys.stdout, indent=2)
+            sys.stdout.write('\n')
+    else:
+        sys.exit(f'Job {final.get("job")} was {final.get("event", "lost")}.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+import pytest
+
+import Time_table as tt
+from benchmark import generate_data
+
+
+@pytest.mark.parametrize("size", ["small", "tight"])
+def test_batch_fitness_matches_conflict_index(size):
+    data = generate_data(size)
+    tt.rd.seed(0)
+    population = tt.Population(10, data)
+    for schedule in population.get_schedules():
+        # Move some classes to random slots so there are clashes to count
+        for i in tt.rd.sample(range(len(schedule.get_classes())), 3):
+            gene = schedule.get_classes()[i]
+            slots = data.get_lab_slots() if gene.batch else data.get_lecture_slots()
+            schedule.set_class(i, tt.Gene(gene.dept, gene.course, gene.room, gene.professor, gene.batch,
+                                          tt.rd.choice(slots)))
+    expected = [schedule.calculate_fitness() for schedule in population.get_schedules()]
+    for schedule in population.get_schedules():
+        schedule.invalidate_fitness()
+    tt.evaluate_population(population)
+    assert [schedule.get_fitness() for schedule in population.get_schedules()] == pytest.approx(expected)
+    assert min(expected) < 1.0
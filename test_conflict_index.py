@@ -0,0 +1,56 @@
+import itertools
+
+import pytest
+
+import Time_table as tt
+from benchmark import generate_data
+
+
+def pair_clashes(data, schedule):
+    overlaps = data.get_slot_overlaps()
+    count = 0
+    for a, b in itertools.combinations(schedule.get_classes(), 2):
+        if overlaps[a.class_time, b.class_time]:
+            count += (a.room == b.room) + (a.professor == b.professor)
+            count += not a.batch or not b.batch or a.batch == b.batch
+    return count
+
+
+@pytest.mark.parametrize("size", ["small", "tight"])
+def test_incremental_conflicts_match_full_recount(size):
+    data = generate_data(size)
+    tt.rd.seed(0)
+    for panel in data.get_panels():
+        schedule = tt.Schedule(data, panel).initialize()
+        index = schedule.get_conflict_index()
+        for _ in range(200):
+            i = tt.rd.randrange(len(schedule.get_classes()))
+            gene = schedule.get_classes()[i]
+            slots = data.get_lab_slots() if gene.batch else data.get_lecture_slots()
+            schedule.set_class(i, tt.Gene(gene.dept, gene.course, gene.room, gene.professor, gene.batch,
+                                          tt.rd.choice(slots)))
+        recounted = tt.Schedule(data, panel)
+        recounted.set_classes(list(schedule.get_classes()))
+        assert schedule.get_conflict_index() is index
+        assert index.get_conflicts() == recounted.get_conflict_index().get_conflicts() == pair_clashes(data, schedule)
+        assert index.get_penalty() == recounted.get_conflict_index().get_penalty()
+
+
+
+def test_incremental_fingerprint_matches_recomputed():
+    data = generate_data("small")
+    tt.rd.seed(0)
+    schedule = tt.Schedule(data, data.get_panels()[0]).initialize()
+    original_classes, original = list(schedule.get_classes()), schedule.get_fingerprint()
+    for _ in range(50):
+        i = tt.rd.randrange(len(schedule.get_classes()))
+        gene = schedule.get_classes()[i]
+        slots = data.get_lab_slots() if gene.batch else data.get_lecture_slots()
+        schedule.set_class(i, tt.Gene(gene.dept, gene.course, gene.room, gene.professor, gene.batch,
+                                      tt.rd.choice(slots)))
+    recomputed = tt.Schedule(data, schedule._panel)
+    recomputed.set_classes(list(schedule.get_classes()))
+    assert schedule.get_fingerprint() == recomputed.get_fingerprint()
+    for i, gene in enumerate(original_classes):
+        schedule.set_class(i, gene)
+    assert schedule.get_fingerprint() == original
@@ -0,0 +1,64 @@
+import itertools
+
+import pytest
+
+import Time_table as tt
+from benchmark import generate_data
+
+
+def instance(lectures_per_week=1, panels=1, rooms=2, lab_rooms=1, professors=1, max_classes_per_day=5, labs=0):
+    # One lecture course taught by every professor, optionally with a lab course of `labs` labs a week
+    names = [f"P{i + 1}" for i in range(professors)]
+    courses = [{"name": "Lecture", "professors": names, "lectures_per_week": lectures_per_week}]
+    if labs:
+        courses.append({"name": "Lab", "type": "lab", "professors": names, "lectures_per_week": 0,
+                        "labs_per_week": labs})
+    return tt.data_from_dict({
+        "max_classes_per_day": max_classes_per_day,
+        "rooms": [f"R{i + 1}" for i in range(rooms)],
+        "lab_rooms": [f"L{i + 1}" for i in range(lab_rooms)],
+        "professors": names,
+        "departments": [{"name": "D", "courses": courses}],
+        "panels": [{"name": f"Panel {i + 1}", "batches": 1} for i in range(panels)],
+    })
+
+
+def clashes(data, schedules):
+    overlaps = data.get_slot_overlaps()
+    genes = [(p, gene) for p, schedule in enumerate(schedules) for gene in schedule.get_classes()]
+    found = []
+    for (p, a), (q, b) in itertools.combinations(genes, 2):
+        if not overlaps[a.class_time, b.class_time]:
+            continue
+        if a.room == b.room:
+            found.append(("room", a, b))
+        if a.professor == b.professor:
+            found.append(("professor", a, b))
+        # A panel's lectures are attended by every batch, its labs by one
+        if p == q and (not a.batch or not b.batch or a.batch == b.batch):
+            found.append(("panel", a, b))
+    return found
+
+
+@pytest.mark.parametrize("size,seed", [(size, seed) for size in ("small", "medium") for seed in range(3)])
+def test_exact_solution_has_no_overlaps(size, seed):
+    data = generate_data(size, seed)
+    tt.rd.seed(seed)
+    schedules = tt.ExactSolver().solve(data)
+    assert tt.timetable_fitness(schedules) == 1.0
+    assert clashes(data, schedules) == []
+    for schedule in schedules:
+        assert len(schedule.get_classes()) == sum(batches or 1 for *_, batches in schedule.get_requirements())
+        assert not schedule.get_conflict_index().exceeds_daily_limits()
+
+
+@pytest.mark.parametrize("data,message", [
+    (instance(lectures_per_week=16, panels=2, rooms=1, professors=2, max_classes_per_day=9), "don't fit in 1 rooms"),
+    (instance(lectures_per_week=31, rooms=2, professors=2, max_classes_per_day=9), "but panel Panel 1 has 31"),
+    (instance(lectures_per_week=30, rooms=2, professors=2, max_classes_per_day=9, labs=1), "but batch 1 of panel"),
+    (instance(lectures_per_week=6, max_classes_per_day=1), "professors can teach at most 5 of the 6"),
+    (instance(labs=1, lab_rooms=0), "Not enough lab rooms"),
+])
+def test_infeasible_instances_are_proved(data, message):
+    with pytest.raises(tt.InfeasibleInstanceError, match=message):
+        tt.ExactSolver().solve(data)
@@ -0,0 +1,19 @@
+import io
+
+import pytest
+
+import Time_table as tt
+
+
+@pytest.mark.parametrize("line", ["SUMMARY:short", "DESCRIPTION:" + "x" * 200, "LOCATION:" + "é" * 100,
+                                  "SUMMARY:" + "a" * 65 + "€" * 40])
+def test_ical_lines_fold_at_75_octets(line):
+    f = io.StringIO()
+    tt._write_ical_line(f, line)
+    text = f.getvalue()
+    assert text.endswith("\r\n")
+    parts = text[:-2].split("\r\n")
+    assert all(len(part.encode("utf-8")) <= 75 for part in parts)
+    assert all(part.startswith(" ") for part in parts[1:])
+    # Unfolding removes each CRLF and the space after it
+    assert parts[0] + "".join(part[1:] for part in parts[1:]) == line
@@ -0,0 +1,48 @@
+import io
+
+import pytest
+
+import Time_table as tt
+
+
+def table(text):
+    return tt.read_table(io.StringIO(text))
+
+
+@pytest.mark.parametrize("instance,message", [
+    ([], "must be a JSON object"),
+    ({"departments": [{"courses": []}]}, "Department 1 must be an object with a name"),
+    ({"departments": [{"name": "D", "courses": [{"professors": []}]}]}, "Course 1 of department D"),
+    ({"professors": ["A"], "departments": [{"name": "D", "courses": [{"name": "X", "professors": ["B"]}]}]},
+     "unknown professors: B"),
+    ({"departments": [{"name": "D", "courses": [{"name": "X", "type": "seminar"}]}]}, "unknown type 'seminar'"),
+    ({"panels": [{"batches": 2}]}, "Panel 1 must be an object with a name"),
+    ({"panels": [{"name": "P", "batches": 0}]}, "at least 1 batch"),
+])
+def test_invalid_instances_are_rejected(instance, message):
+    with pytest.raises(ValueError, match=message):
+        tt.data_from_dict(instance)
+
+
+def test_tables_with_blank_cells_and_no_rows_load():
+    pytest.importorskip("pandas")
+    data = tt.data_from_frames(table("number,type\nR1,room\nL1,lab\n"), table("name\nA\n"),
+                               table("department,name,professors,type,labs_per_week\n"
+                                     "D,X,A,lab,\nD,Y,A,lecture,\nD,Z,A,lab,2\n"),
+                               table("name,batches\nP,\n"))
+    assert [course.get_labs_per_week() for course in data.get_courses()] == [1, 0, 2]
+    assert data.get_panels()[0].get_num_batches() == 1
+    data = tt.data_from_frames(table("number\n"), table("name\n"), table("department,name,professors\n"),
+                               table("name\n"))
+    assert data.get_courses() == [] and data.get_panels() == []
+
+
+@pytest.mark.parametrize("courses,panels,message", [
+    ("department,name,professors\nD,X,B\n", "name\nP\n", "unknown professors: B"),
+    ("department,name,professors,lectures_per_week\nD,X,A,two\n", "name\nP\n", "invalid lectures_per_week .* rows 2"),
+    ("department,name,professors\n", "name,batches\nP,1\nQ,0\n", "invalid batches .* rows 3"),
+])
+def test_invalid_tables_are_rejected(courses, panels, message):
+    pytest.importorskip("pandas")
+    with pytest.raises(ValueError, match=message):
+        tt.data_from_frames(table("number\nR1\n"), table("name\nA\n"), table(courses), table(panels))
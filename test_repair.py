@@ -0,0 +1,26 @@
+import copy
+
+import pytest
+
+import Time_table as tt
+from benchmark import generate_instance
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_repair_keeps_valid_placements(seed):
+    instance = generate_instance("medium", seed)
+    tt.rd.seed(seed)
+    previous = tt.ExactSolver().solve(tt.data_from_dict(instance))
+    changed = copy.deepcopy(instance)
+    removed = changed["rooms"].pop()
+    changed["departments"][0]["courses"][0]["lectures_per_week"] += 1
+    data = tt.data_from_dict(changed)
+
+    repaired = tt.repair(previous, data)
+    assert tt.timetable_fitness(repaired) == 1.0
+    for old, new in zip(previous, repaired):
+        assert len(new.get_classes()) == len(old.get_classes()) + 1
+        kept = [c for c in old.get_decoded_classes() if c["room"] != str(removed)]
+        classes = new.get_decoded_classes()
+        assert all(c in classes for c in kept)
+        assert all(c["room"] != str(removed) for c in classes)
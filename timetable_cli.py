@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import sys
+from contextlib import nullcontext
+
+from Time_table import (EXPORT_FORMATS, RESULT_CACHE_MAX_BYTES, SOLVERS, InfeasibleInstanceError, ResultCache,
+                        SolverConfig, Telemetry, export_timetable, load_instance, repair, schedules_from_dict,
+                        schedules_to_dict, solve)
+
+
+def build_parser():
+    defaults = SolverConfig()
+    parser = argparse.ArgumentParser(description='Generate a university timetable without the Streamlit UI.')
+    parser.add_argument('instance', help='JSON instance file, or a directory with rooms, professors, courses '
+                                         'and panels tables as .csv or .json')
+    parser.add_argument('-o', '--output', help='where to write the timetable JSON (default: stdout)')
+    parser.add_argument('--solver', choices=SOLVERS, default=defaults.solver,
+                        help='memetic adds tabu search to the GA; multipanel evolves one sub-population per panel '
+                             'against shared rooms and professors; exact colours the conflict graph and '
+                             'reports when no timetable exists')
+    parser.add_argument('--generations', type=int, default=defaults.generations,
+                        help='generations, or rounds for the multipanel solver')
+    parser.add_argument('--population-size', type=int, default=defaults.population_size,
+                        help='schedules per panel, split between the island workers')
+    parser.add_argument('--crossover', choices=['uniform', 'slot', 'reinitialize'], default=defaults.crossover)
+    parser.add_argument('--mutation', choices=['targeted', 'reinitialize'], default=defaults.mutation)
+    parser.add_argument('--workers', type=int, default=defaults.workers, help='island worker processes (GA solver only)')
+    parser.add_argument('--migration-interval', type=int, default=defaults.migration_interval)
+    parser.add_argument('--time-limit', type=float, default=defaults.time_limit,
+                        help='stop after this many seconds with the best timetable so far')
+    parser.add_argument('--stagnation-limit', type=int, default=defaults.stagnation_limit,
+                        help='stop after this many generations without improvement')
+    parser.add_argument('--mutation-rate', type=float, default=defaults.mutation_rate)
+    parser.add_argument('--tournament-size', type=int, default=defaults.tournament_size)
+    parser.add_argument('--elite-size', type=int, default=defaults.elite_size)
+    parser.add_argument('--fitness-cache-size', type=int, default=defaults.fitness_cache_size,
+                        help='schedules whose fitness the GA remembers by fingerprint (0 disables)')
+    parser.add_argument('--fixed-parameters', action='store_true',
+                        help='keep mutation rate and tournament size fixed instead of adapting them to diversity')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--cache-dir', help='reuse and store results in this directory')
+    parser.add_argument('--cache-max-mb', type=float, default=RESULT_CACHE_MAX_BYTES / (1024 * 1024),
+                        help='evict least recently used results above this size')
+    parser.add_argument('--previous', help='timetable JSON from an earlier run to repair for the changed instance, '
+                                           'moving as few classes as possible')
+    parser.add_argument('--export', action='append', default=[],
+                        help=f'also write the timetable here as {", ".join(EXPORT_FORMATS)} by file extension '
+                             '(repeatable)')
+    parser.add_argument('--telemetry', help='append per-generation metrics to this JSON-lines file')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not report progress on stderr')
+    return parser
+
+
+def config_from_args(args):
+    return SolverConfig(
+        population_size=args.population_size,
+        generations=args.generations,
+        crossover=args.crossover,
+        mutation=args.mutation,
+        workers=args.workers,
+        migration_interval=args.migration_interval,
+        seed=args.seed,
+        solver=args.solver,
+        time_limit=args.time_limit,
+        stagnation_limit=args.stagnation_limit,
+        mutation_rate=args.mutation_rate,
+        tournament_size=args.tournament_size,
+        elite_size=args.elite_size,
+        adaptive=not args.fixed_parameters,
+        fitness_cache_size=args.fitness_cache_size,
+    )
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    for path in args.export:
+        if os.path.splitext(path)[1].lower() not in EXPORT_FORMATS:
+            parser.error(f'--export {path}: use one of {", ".join(EXPORT_FORMATS)}')
+    try:
+        config = config_from_args(args)
+    except ValueError as error:
+        parser.error(str(error))
+    try:
+        data = load_instance(args.instance)
+    except (OSError, ValueError) as error:
+        parser.error(f'cannot load {args.instance}: {error}')
+
+    def report_progress(generation, best_fitness):
+        if not args.quiet and (args.workers > 1 or generation % 100 == 0):
+            print(f'Generation {generation}: best fitness {best_fitness:.4f}', file=sys.stderr)
+
+    previous = None
+    if args.previous:
+        try:
+            with open(args.previous) as f:
+                previous = schedules_from_dict(json.load(f), data)
+        except (OSError, ValueError) as error:
+            parser.error(f'cannot load {args.previous}: {error}')
+        except (KeyError, TypeError) as error:
+            parser.error(f'{args.previous} is not a timetable JSON from this tool: {error!r}')
+
+    cache = ResultCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024)) if args.cache_dir else None
+    try:
+        if previous is not None:
+            schedules = repair(previous, data)
+        else:
+            with Telemetry(args.telemetry) if args.telemetry else nullcontext() as telemetry:
+                schedules = solve(data, config, report_progress, cache=cache, telemetry=telemetry)
+    except InfeasibleInstanceError as error:
+        sys.exit(f'No timetable exists: {error}')
+    for path in args.export:
+        export_timetable(schedules, data, path)
+    result = schedules_to_dict(schedules, data)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()